@@ -0,0 +1,92 @@
+"""Regression benchmark for ProwlerManager.make_compliance_results.
+
+Aggregation cost per (finding, requirement) pair must not depend on the number of
+requirements in the compliance framework. The benchmark aggregates the same number
+of synthetic findings against a small and a large framework and prints the cost
+per finding and per requirement update.
+
+Usage (from the repository root):
+    PYTHONPATH=src python benchmark/aggregation_benchmark.py --findings 100000
+"""
+import argparse
+import random
+import time
+
+from plugin.manager.prowler_manager import ProwlerManager
+
+
+def make_manager(provider: str, compliance_framework: str) -> ProwlerManager:
+    manager = ProwlerManager()
+    manager.provider = provider
+    manager.cloud_service_type = compliance_framework
+    manager.cloud_service_types = [compliance_framework]
+    manager._load_requirement_info()
+    return manager
+
+
+def make_findings(manager: ProwlerManager, count: int, seed: int = 0) -> list:
+    rand = random.Random(seed)
+    requirement_ids_by_check = {}
+    for requirement in manager.requirement_info[manager.cloud_service_type]["Requirements"]:
+        for check_id in requirement["Checks"]:
+            requirement_ids_by_check.setdefault(check_id, []).append(requirement["Id"])
+    check_ids = sorted(requirement_ids_by_check)
+
+    findings = []
+    for i in range(count):
+        check_id = rand.choice(check_ids)
+        findings.append(
+            {
+                "metadata": {"event_code": check_id},
+                "cloud": {"account": {"uid": "123456789012"}, "region": rand.choice(["us-east-1", "eu-west-1"])},
+                "unmapped": {
+                    "compliance": {manager.cloud_service_type: requirement_ids_by_check[check_id]},
+                    "check_type": "",
+                },
+                "status_code": rand.choice(["PASS", "FAIL", "MANUAL"]),
+                "status_detail": "",
+                "severity": rand.choice(["Critical", "High", "Medium", "Low"]),
+                "finding_info": {"uid": f"finding-{i}", "title": check_id, "desc": ""},
+                "resources": [{"name": f"resource-{i}", "uid": f"resource-{i}", "type": "", "group": {"name": ""}}],
+                "risk_details": "",
+                "remediation": {"desc": "", "references": []},
+            }
+        )
+    return findings
+
+
+def run(provider: str, compliance_framework: str, count: int) -> None:
+    manager = make_manager(provider, compliance_framework)
+    findings = make_findings(manager, count)
+    requirement_count = len(manager.requirement_info[compliance_framework]["Requirements"])
+    update_count = sum(
+        len(finding["unmapped"]["compliance"][compliance_framework]) for finding in findings
+    )
+
+    start_time = time.perf_counter()
+    for finding in findings:
+        manager.make_compliance_results(finding)
+    duration = time.perf_counter() - start_time
+
+    print(
+        f"{compliance_framework:<28} requirements={requirement_count:<5} findings={count:<8} "
+        f"total={duration:.2f}s per_finding={duration / count * 1e6:.1f}us "
+        f"per_requirement_update={duration / update_count * 1e6:.2f}us"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--provider", default="aws")
+    parser.add_argument("--findings", type=int, default=100000)
+    parser.add_argument(
+        "--frameworks", nargs="+", default=["CIS-3.0", "NIST-800-53-Revision-5"]
+    )
+    args = parser.parse_args()
+
+    for compliance_framework in args.frameworks:
+        run(args.provider, compliance_framework, args.findings)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Offline benchmark of the hot paths of a collect.
+
+Times the three phases that run on the plugin side for every finding, separately:
+    parse: ProwlerConnector._read_findings over an output.ocsf.json written by ocsf_generator
+    aggregate: ProwlerManager.make_compliance_results
+    convert: ProwlerManager._convert_results
+and records the duration and the peak RSS of each phase. Each finding count runs in a fresh process.
+Requirements are loaded from the compliance files bundled with prowler, so no network access is needed.
+
+Results can be saved with --output and compared with a previous run with --baseline. The benchmark
+exits with 1 when a phase is slower than the baseline by more than --tolerance.
+
+Usage (from the repository root):
+    PYTHONPATH=src python benchmark/hot_path_benchmark.py --sizes 10000 100000 1000000 --output baseline.json
+    PYTHONPATH=src python benchmark/hot_path_benchmark.py --sizes 10000 100000 1000000 --baseline baseline.json
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from multiprocessing import get_context
+
+from plugin.connector.prowler_connector import ProwlerConnector
+from plugin.manager.prowler_manager import ProwlerManager
+from ocsf_generator import get_compliance_map, generate_findings, write_output
+
+_AGGREGATION_BATCH_SIZE = 10000
+
+
+def reset_peak_rss() -> None:
+    # Resets VmHWM to the current RSS (Linux)
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def get_peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def make_manager(provider: str, compliance_frameworks: list) -> ProwlerManager:
+    manager = ProwlerManager()
+    manager.provider = provider
+    manager.cloud_service_types = compliance_frameworks
+    manager.cloud_service_type = compliance_frameworks[0]
+    manager._load_requirement_info()
+    return manager
+
+
+def run(args: argparse.Namespace, count: int) -> dict:
+    results = {}
+    compliance_map = get_compliance_map(args.provider, args.frameworks)
+
+    with tempfile.TemporaryDirectory(dir=args.temp_dir) as temp_dir:
+        file_path = os.path.join(temp_dir, "output.ocsf.json")
+        write_output(
+            file_path,
+            generate_findings(count, compliance_map, args.checks, args.regions, args.fail_ratio, args.seed),
+        )
+
+        reset_peak_rss()
+        start_time = time.perf_counter()
+        with open(file_path, "rb") as file:
+            parsed_count = sum(1 for _ in ProwlerConnector._read_findings(file))
+        results["parse"] = {"seconds": time.perf_counter() - start_time, "peak_rss_mb": get_peak_rss_mb()}
+        assert parsed_count == count, f"parsed {parsed_count} of {count} findings"
+
+        # Findings are parsed in batches outside of the timed section (peak RSS includes one batch)
+        manager = make_manager(args.provider, args.frameworks)
+        reset_peak_rss()
+        duration = 0.0
+        with open(file_path, "rb") as file:
+            findings = ProwlerConnector._read_findings(file)
+            while batch := list(islice(findings, _AGGREGATION_BATCH_SIZE)):
+                start_time = time.perf_counter()
+                for finding, _ in batch:
+                    manager.make_compliance_results(finding)
+                duration += time.perf_counter() - start_time
+        results["aggregate"] = {"seconds": duration, "peak_rss_mb": get_peak_rss_mb()}
+
+        reset_peak_rss()
+        start_time = time.perf_counter()
+        record_count = sum(1 for _ in manager._convert_results(manager.compliance_results))
+        results["convert"] = {
+            "seconds": time.perf_counter() - start_time,
+            "peak_rss_mb": get_peak_rss_mb(),
+            "records": record_count,
+        }
+
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    for count, phases in results.items():
+        for phase, result in phases.items():
+            baseline_result = baseline.get(count, {}).get(phase)
+            if baseline_result and result["seconds"] > baseline_result["seconds"] * (1 + tolerance):
+                regressions.append(
+                    f"{phase} ({count} findings): {baseline_result['seconds']:.2f}s -> {result['seconds']:.2f}s"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--provider", default="aws")
+    parser.add_argument("--frameworks", nargs="+", default=["CIS-3.0"])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--checks", type=int, default=None, help="Number of checks (default: all checks of the frameworks)")
+    parser.add_argument("--regions", type=int, default=3, help="Number of regions the findings are spread over")
+    parser.add_argument("--fail-ratio", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--temp-dir", default=None, help="Directory of the generated output (about 4.5 KB per finding)")
+    parser.add_argument("--output", help="Save the results as JSON")
+    parser.add_argument("--baseline", help="Compare with the results of a previous run")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = {}
+    for count in args.sizes:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+            results[str(count)] = executor.submit(run, args, count).result()
+
+        for phase, result in results[str(count)].items():
+            print(
+                f"findings={count:<8} {phase:<10} total={result['seconds']:.2f}s "
+                f"per_finding={result['seconds'] / count * 1e6:.1f}us peak_rss={result['peak_rss_mb']:.0f}MB"
+            )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
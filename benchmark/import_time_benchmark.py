@@ -0,0 +1,85 @@
+"""Import time of the plugin server module (plugin.main).
+
+Runs `python -X importtime` in a fresh interpreter that imports the collector SDK first and plugin.main
+after it, so the measured time is what the plugin itself adds to the cold start of the server and to
+the first Collector.init. Modules that must only be loaded by the first Collector.collect (prowler and
+its dependencies) are reported as violations.
+
+The benchmark exits with 1 when the import time exceeds --budget-ms or a lazy module was imported.
+
+Usage (from the repository root):
+    PYTHONPATH=src python benchmark/import_time_benchmark.py
+    PYTHONPATH=src python benchmark/import_time_benchmark.py --budget-ms 30 --repeat 10
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+_IMPORT_SCRIPT = """
+from spaceone.core import config
+config.init_conf(package="plugin")
+import spaceone.inventory.plugin.collector.lib.server
+import plugin.main
+"""
+
+# Loaded by the first Collector.collect, never by the server start or Collector.init
+_LAZY_MODULES = ["prowler", "natsort", "boto3", "botocore", "ijson", "plugin.manager.prowler_manager"]
+
+
+def measure() -> dict:
+    """{module: (self_us, cumulative_us)} of the modules imported by `import plugin.main`"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _IMPORT_SCRIPT],
+        capture_output=True,
+        text=True,
+        env=os.environ.copy(),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr)
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # Top level imports are indented by one space. Everything before the SDK is not measured.
+        if name.strip() == "spaceone.inventory.plugin.collector.lib.server" and not name.startswith("  "):
+            modules.clear()
+        else:
+            modules[name.strip()] = (int(self_us), int(cumulative_us))
+
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="Budget of the import time of plugin.main")
+    parser.add_argument("--repeat", type=int, default=5, help="The fastest run is reported")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest modules to print")
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(args.repeat)]
+    modules = min(runs, key=lambda run: run["plugin.main"][1])
+    import_time_ms = modules["plugin.main"][1] / 1000
+
+    print(f"plugin.main import time: {import_time_ms:.1f}ms (budget: {args.budget_ms:.1f}ms, modules: {len(modules)})")
+    for name, (self_us, cumulative_us) in sorted(modules.items(), key=lambda item: -item[1][0])[:args.top]:
+        print(f"    {name:<60} self={self_us / 1000:.1f}ms cumulative={cumulative_us / 1000:.1f}ms")
+
+    violations = []
+    if import_time_ms > args.budget_ms:
+        violations.append(f"import time {import_time_ms:.1f}ms exceeds the budget {args.budget_ms:.1f}ms")
+    for name in _LAZY_MODULES:
+        if name in modules:
+            violations.append(f"{name} is imported at server start")
+
+    for violation in violations:
+        print(f"VIOLATION {violation}")
+    if violations:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
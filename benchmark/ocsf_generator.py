@@ -0,0 +1,136 @@
+"""Synthetic prowler OCSF findings for the benchmarks.
+
+Findings have the shape of prowler 4.x output.ocsf.json, including the unused resource details,
+and are mapped to the requirements of compliance frameworks bundled with prowler, so no cloud
+account or network access is needed.
+"""
+import json
+import random
+from typing import Dict, Generator, List
+
+from plugin.conf.collector_conf import REGIONS
+from plugin.manager.prowler_manager import ProwlerManager
+
+
+def get_compliance_map(provider: str, compliance_frameworks: List[str]) -> Dict[str, dict]:
+    """check_id -> {compliance_framework: [requirement_id]} from prowler's bundled compliance files"""
+    compliance_map = {}
+    for compliance_framework in compliance_frameworks:
+        requirement_info = ProwlerManager.get_requirement_info(provider, compliance_framework)
+        for requirement in requirement_info["Requirements"]:
+            for check_id in requirement["Checks"]:
+                requirement_ids = compliance_map.setdefault(check_id, {}).setdefault(compliance_framework, [])
+                if requirement["Id"] not in requirement_ids:
+                    requirement_ids.append(requirement["Id"])
+    return compliance_map
+
+
+def make_finding(
+        i: int, check_id: str, region: str, status_code: str, compliance: dict, account: str = "123456789012",
+        tag_count: int = 5
+) -> dict:
+    service = check_id.split("_")[0]
+    resource_uid = f"arn:aws:{service}:{region}:{account}:resource/resource-{i}"
+    return {
+        "metadata": {
+            "event_code": check_id,
+            "product": {"name": "Prowler", "vendor_name": "Prowler", "version": "4.4.0"},
+            "profiles": ["cloud", "datetime"],
+            "tenant_uid": "",
+            "version": "1.2.0",
+        },
+        "severity_id": 4,
+        "severity": ["Critical", "High", "Medium", "Low"][len(check_id) % 4],
+        "status": "New",
+        "status_code": status_code,
+        "status_detail": f"Resource resource-{i} {'does not comply' if status_code == 'FAIL' else 'complies'} with {check_id}.",
+        "status_id": 1,
+        "unmapped": {
+            "check_type": "Software and Configuration Checks",
+            "related_url": "",
+            "categories": ["forensics-ready"],
+            "depends_on": [],
+            "related_to": [],
+            "notes": "",
+            "compliance": compliance,
+        },
+        "activity_name": "Create",
+        "activity_id": 1,
+        "finding_info": {
+            "created_time": 1700000000,
+            "desc": f"Description of {check_id}.",
+            "product_uid": "prowler",
+            "title": f"Title of {check_id}",
+            "uid": f"prowler-aws-{check_id}-{account}-{region}-resource-{i}",
+        },
+        "resources": [
+            {
+                "cloud_partition": "aws",
+                "region": region,
+                "data": {
+                    "details": "",
+                    "metadata": {
+                        "arn": resource_uid,
+                        "name": f"resource-{i}",
+                        "tags": [{"Key": f"tag-{j}", "Value": f"value-{j}"} for j in range(tag_count)],
+                        "policy": {
+                            "Version": "2012-10-17",
+                            "Statement": [
+                                {"Effect": "Allow", "Principal": {"Service": "ec2.amazonaws.com"}, "Action": ["sts:AssumeRole"]}
+                            ],
+                        },
+                    },
+                },
+                "group": {"name": service},
+                "labels": ["team:security", "env:prod"],
+                "name": f"resource-{i}",
+                "type": "AwsResource",
+                "uid": resource_uid,
+            }
+        ],
+        "category_name": "Findings",
+        "category_uid": 2,
+        "class_name": "Detection Finding",
+        "class_uid": 2004,
+        "cloud": {
+            "account": {"name": "", "type": "AWS_Account", "type_id": 10, "uid": account, "labels": []},
+            "org": {"name": "", "uid": ""},
+            "provider": "aws",
+            "region": region,
+        },
+        "event_time": 1700000000,
+        "remediation": {
+            "desc": f"Remediation of {check_id}.",
+            "references": [f"https://docs.prowler.com/checks/aws/{check_id}"],
+        },
+        "risk_details": f"Risk of {check_id}.",
+        "time": 1700000000,
+        "type_uid": 200401,
+        "type_name": "Create",
+    }
+
+
+def generate_findings(
+        count: int, compliance_map: Dict[str, dict], check_count: int = None, region_count: int = 3,
+        fail_ratio: float = 0.3, seed: int = 0
+) -> Generator[dict, None, None]:
+    """Findings spread evenly over check_count checks and randomly over region_count regions."""
+    rand = random.Random(seed)
+    check_ids = sorted(compliance_map)[:check_count]
+    regions = REGIONS["aws"][:region_count]
+
+    for i in range(count):
+        check_id = check_ids[i % len(check_ids)]
+        status_code = "FAIL" if rand.random() < fail_ratio else "PASS"
+        yield make_finding(i, check_id, rand.choice(regions), status_code, compliance_map[check_id])
+
+
+def write_output(file_path: str, findings) -> None:
+    """Write findings the way prowler writes output.ocsf.json (indented objects separated by commas)"""
+    with open(file_path, "w") as f:
+        f.write("[")
+        for i, finding in enumerate(findings):
+            if i:
+                f.write(",")
+            f.write(json.dumps(finding, indent=4))
+        f.write("]")
@@ -0,0 +1,138 @@
+"""Parse throughput of prowler OCSF output.
+
+Compares the parser used by ProwlerConnector (plugin.connector.ocsf_reader.read_findings) with
+building every finding by ijson.items, and with projecting findings from ijson prefix events,
+for each available ijson backend. Findings are generated by ocsf_generator.
+
+Usage (from the repository root):
+    PYTHONPATH=src python benchmark/ocsf_parser_benchmark.py --findings 20000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import ijson
+
+from plugin.connector.ocsf_reader import read_findings, get_parser_name
+from ocsf_generator import get_compliance_map, generate_findings, write_output
+
+# prefix -> (container, key) of the fields read by ProwlerManager
+_PROJECTED_FIELDS = {
+    "item.metadata.event_code": ("metadata", "event_code"),
+    "item.cloud.account.uid": ("account", "uid"),
+    "item.cloud.region": ("cloud", "region"),
+    "item.unmapped.check_type": ("unmapped", "check_type"),
+    "item.status_code": ("finding", "status_code"),
+    "item.status_detail": ("finding", "status_detail"),
+    "item.severity": ("finding", "severity"),
+    "item.risk_details": ("finding", "risk_details"),
+    "item.finding_info.uid": ("finding_info", "uid"),
+    "item.finding_info.title": ("finding_info", "title"),
+    "item.finding_info.desc": ("finding_info", "desc"),
+    "item.remediation.desc": ("remediation", "desc"),
+    "item.resources.item.name": ("resource", "name"),
+    "item.resources.item.uid": ("resource", "uid"),
+    "item.resources.item.type": ("resource", "type"),
+    "item.resources.item.group.name": ("group", "name"),
+}
+
+
+def parse_projected_events(backend, file):
+    containers = None
+    compliance = None
+    compliance_prefix = None
+    references = None
+
+    for prefix, event, value in backend.parse(file):
+        field = _PROJECTED_FIELDS.get(prefix)
+        if field is not None:
+            container = containers[field[0]]
+            if container is not None and event not in ("start_map", "start_array"):
+                container[field[1]] = value
+        elif prefix == compliance_prefix:
+            compliance.append(value)
+        elif prefix == "item.remediation.references.item":
+            references.append(value)
+        elif prefix == "item.unmapped.compliance" and event == "map_key":
+            # Framework names contain dots, so they are taken from map_key events
+            compliance = containers["unmapped"]["compliance"][value] = []
+            compliance_prefix = f"item.unmapped.compliance.{value}.item"
+        elif prefix == "item.remediation.references" and event == "start_array":
+            references = containers["remediation"]["references"] = []
+        elif prefix == "item.resources.item" and event == "start_map":
+            finding = containers["finding"]
+            if finding["resources"]:
+                containers["resource"] = containers["group"] = None
+            else:
+                containers["group"] = {}
+                containers["resource"] = {"group": containers["group"]}
+                finding["resources"].append(containers["resource"])
+        elif prefix == "item":
+            if event == "start_map":
+                finding = {
+                    "metadata": {},
+                    "cloud": {"account": {}},
+                    "unmapped": {"compliance": {}},
+                    "finding_info": {},
+                    "resources": [],
+                    "remediation": {},
+                }
+                containers = {
+                    "finding": finding,
+                    "metadata": finding["metadata"],
+                    "cloud": finding["cloud"],
+                    "account": finding["cloud"]["account"],
+                    "unmapped": finding["unmapped"],
+                    "finding_info": finding["finding_info"],
+                    "remediation": finding["remediation"],
+                    "resource": None,
+                    "group": None,
+                }
+            elif event == "end_map":
+                yield containers["finding"]
+
+
+def get_ijson_backends() -> dict:
+    backends = {}
+    for backend_name in ["yajl2_c", "yajl2_cffi", "yajl2", "python"]:
+        try:
+            backends[backend_name] = ijson.get_backend(backend_name)
+        except ImportError:
+            continue
+    return backends
+
+
+def measure(name: str, parse, file_path: str) -> None:
+    with open(file_path, "rb") as file:
+        start_time = time.perf_counter()
+        count = sum(1 for _ in parse(file))
+        duration = time.perf_counter() - start_time
+
+    print(f"{name:<40} findings={count:<8} total={duration:.2f}s findings/sec={count / duration:,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--findings", type=int, default=20000)
+    parser.add_argument(
+        "--skip-python-backend", action="store_true", help="The pure python ijson backend is very slow"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "output.ocsf.json")
+        compliance_map = get_compliance_map("aws", ["CIS-3.0", "NIST-800-53-Revision-5"])
+        write_output(file_path, generate_findings(args.findings, compliance_map))
+        print(f"output size: {os.path.getsize(file_path) / 1024 / 1024:.1f} MB")
+
+        measure(f"read_findings [{get_parser_name()}]", read_findings, file_path)
+        for backend_name, backend in get_ijson_backends().items():
+            if backend_name == "python" and args.skip_python_backend:
+                continue
+            measure(f"ijson.items [{backend_name}]", lambda file: backend.items(file, "item"), file_path)
+            measure(f"ijson.parse projected [{backend_name}]", lambda file: parse_projected_events(backend, file), file_path)
+
+
+if __name__ == "__main__":
+    main()
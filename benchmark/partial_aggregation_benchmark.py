@@ -0,0 +1,95 @@
+"""Differential check and benchmark of partial aggregation (options.aggregation_workers).
+
+Synthetic findings are split into output files at random boundaries. The compliance records of
+the files aggregated in worker processes and merged must equal the records of the files parsed
+and aggregated one by one. The script exits with 1 when they differ. Parallel time includes the
+startup of the worker processes.
+
+Usage (from the repository root):
+    PYTHONPATH=src python benchmark/partial_aggregation_benchmark.py --findings 100000 --files 8
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from aggregation_benchmark import make_manager, make_findings
+from plugin.connector.ocsf_reader import read_findings
+from plugin.manager.partial_aggregator import PartialAggregator
+
+
+def split_findings(findings: list, count: int, seed: int) -> list:
+    rand = random.Random(seed)
+    boundaries = sorted(rand.sample(range(1, len(findings)), count - 1))
+    return [findings[start:end] for start, end in zip([0] + boundaries, boundaries + [len(findings)])]
+
+
+def convert(manager) -> list:
+    return list(manager._convert_results(manager.compliance_results))
+
+
+def run(provider: str, compliance_framework: str, count: int, file_count: int, workers: int, seed: int) -> bool:
+    manager = make_manager(provider, compliance_framework)
+    findings = make_findings(manager, count, seed)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_paths = []
+        for i, part in enumerate(split_findings(findings, file_count, seed)):
+            file_paths.append(os.path.join(temp_dir, f"output-{i}.ocsf.json"))
+            with open(file_paths[-1], "w") as f:
+                json.dump(part, f)
+
+        start_time = time.perf_counter()
+        for file_path in file_paths:
+            with open(file_path, "rb") as f:
+                for finding in read_findings(f):
+                    manager.make_compliance_results(finding)
+        sequential_time = time.perf_counter() - start_time
+        expected = convert(manager)
+
+        manager = make_manager(provider, compliance_framework)
+        partial_aggregator = PartialAggregator(provider, [compliance_framework], manager.requirement_info, workers)
+        try:
+            start_time = time.perf_counter()
+            for file_path in file_paths:
+                partial_aggregator.submit(file_path)
+            for compliance_results, _, _ in partial_aggregator.get_results():
+                manager.merge_compliance_results(compliance_results)
+            parallel_time = time.perf_counter() - start_time
+        finally:
+            partial_aggregator.shutdown()
+
+    is_same = convert(manager) == expected
+    print(
+        f"{compliance_framework:<28} findings={count:<8} files={file_count:<3} workers={workers:<3} "
+        f"sequential={sequential_time:.2f}s parallel={parallel_time:.2f}s "
+        f"result={'SAME' if is_same else 'DIFFERENT'}"
+    )
+    return is_same
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--provider", default="aws")
+    parser.add_argument("--findings", type=int, default=100000)
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seeds", type=int, default=3)
+    parser.add_argument(
+        "--frameworks", nargs="+", default=["CIS-3.0", "NIST-800-53-Revision-5"]
+    )
+    args = parser.parse_args()
+
+    is_same = True
+    for compliance_framework in args.frameworks:
+        for seed in range(args.seeds):
+            is_same &= run(args.provider, compliance_framework, args.findings, args.files, args.workers, seed)
+
+    sys.exit(0 if is_same else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Makespan simulator for CheckScheduler.
+
+Compares longest-processing-time-first packing against naive round-robin sharding of the
+checks of a compliance framework. Check runtimes are taken from the local runtime history
+when available, otherwise they are drawn from a heavy-tailed distribution, since a few
+checks (e.g. IAM credential report, CloudTrail lookups) dominate a scan.
+
+Usage (from the repository root):
+    PYTHONPATH=src python benchmark/scheduler_simulator.py --framework CIS-3.0 --workers 2 4 8
+"""
+import argparse
+import random
+
+from plugin.manager.check_scheduler import CheckScheduler
+from plugin.manager.prowler_manager import ProwlerManager
+
+
+def make_runtimes(checks: list, check_scheduler: CheckScheduler, seed: int = 0) -> dict:
+    rand = random.Random(seed)
+    runtimes = {}
+    for check_id in checks:
+        if check_id in check_scheduler.check_runtimes:
+            runtimes[check_id] = check_scheduler.check_runtimes[check_id]
+        else:
+            runtimes[check_id] = rand.lognormvariate(1.0, 1.2)
+    return runtimes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--provider", default="aws")
+    parser.add_argument("--framework", default="CIS-3.0")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8, 16])
+    args = parser.parse_args()
+
+    requirement_info = ProwlerManager.get_requirement_info(args.provider, args.framework)
+    checks = sorted({check_id for requirement in requirement_info["Requirements"] for check_id in requirement["Checks"]})
+    runtimes = make_runtimes(checks, CheckScheduler(args.provider))
+    serial = sum(runtimes.values())
+
+    print(f"{args.framework}: checks={len(checks)} serial={serial:.1f}s")
+    for worker_count in args.workers:
+        _, round_robin = CheckScheduler.pack_round_robin(runtimes, worker_count)
+        _, lpt = CheckScheduler.pack_longest_processing_time_first(runtimes, worker_count)
+        print(
+            f"workers={worker_count:<3} round_robin={round_robin:8.1f}s lpt={lpt:8.1f}s "
+            f"lower_bound={max(serial / worker_count, max(runtimes.values())):8.1f}s "
+            f"improvement={round_robin / lpt:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
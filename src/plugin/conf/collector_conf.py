@@ -134,6 +134,58 @@ REGIONS = {
     ]
 }
 
+# Services whose findings are not bound to an audited region
+GLOBAL_SERVICES = {
+    "aws": [
+        "account",
+        "cloudfront",
+        "fms",
+        "iam",
+        "organizations",
+        "route53",
+        "shield",
+        "trustedadvisor",
+    ]
+}
+
+# Checks of regional services that report account-level findings in the default region
+ACCOUNT_LEVEL_CHECKS = {
+    "aws": [
+        "backup_plans_exist",
+        "backup_reportplans_exist",
+        "backup_vaults_exist",
+        "cloudtrail_s3_dataevents_read_enabled",
+        "cloudtrail_s3_dataevents_write_enabled",
+        "cloudtrail_threat_detection_enumeration",
+        "cloudtrail_threat_detection_privilege_escalation",
+        "cloudwatch_changes_to_network_acls_alarm_configured",
+        "cloudwatch_changes_to_network_gateways_alarm_configured",
+        "cloudwatch_changes_to_network_route_tables_alarm_configured",
+        "cloudwatch_changes_to_vpcs_alarm_configured",
+        "cloudwatch_cross_account_sharing_disabled",
+        "cloudwatch_log_metric_filter_and_alarm_for_aws_config_configuration_changes_enabled",
+        "cloudwatch_log_metric_filter_and_alarm_for_cloudtrail_configuration_changes_enabled",
+        "cloudwatch_log_metric_filter_authentication_failures",
+        "cloudwatch_log_metric_filter_aws_organizations_changes",
+        "cloudwatch_log_metric_filter_disable_or_scheduled_deletion_of_kms_cmk",
+        "cloudwatch_log_metric_filter_for_s3_bucket_policy_changes",
+        "cloudwatch_log_metric_filter_policy_changes",
+        "cloudwatch_log_metric_filter_root_usage",
+        "cloudwatch_log_metric_filter_security_group_changes",
+        "cloudwatch_log_metric_filter_sign_in_without_mfa",
+        "cloudwatch_log_metric_filter_unauthorized_api_calls",
+        "cognito_user_pool_client_prevent_user_existence_errors",
+        "cognito_user_pool_client_token_revocation_enabled",
+        "resourceexplorer2_indexes_found",
+        "s3_account_level_public_access_blocks",
+        "s3_bucket_public_access",
+        "s3_bucket_public_list_acl",
+        "s3_bucket_public_write_acl",
+        "ssmincidents_enabled_with_plans",
+        "vpc_different_regions",
+    ]
+}
+
 SERVICES = {
     "aws": {
         "AccessAnalyzer": "accessanalyzer",
@@ -9,3 +9,90 @@ SUPPORTED_RESOURCE_TYPE = [
 SUPPORTED_SCHEDULES = ["hours"]
 
 SUPPORTED_FEATURES = ["garbage_collection"]
+
+# Max number of compliance frameworks kept in the requirement info cache
+REQUIREMENT_INFO_CACHE_SIZE = 16
+
+# Compliance frameworks loaded into the requirement info cache at server start
+# ex) {"aws": ["CIS-3.0", "SOC2"], "azure": ["CIS-2.1"]}
+PRELOAD_COMPLIANCE_FRAMEWORKS = {}
+
+# Estimated CPU and peak memory of a prowler process, used to admit and size concurrent prowler processes
+PROWLER_PROCESS_CPU = 1
+PROWLER_PROCESS_MEMORY_MB = 1024
+
+# CPU and memory budgets of all prowler processes in the plugin server (0: CPU count, 80% of the memory limit)
+ADMISSION_CPU_BUDGET = 0
+ADMISSION_MEMORY_BUDGET_MB = 0
+
+# Local directory for the collector state such as check runtime history
+PLUGIN_DATA_DIR = "~/.spaceone/plugin-prowler-inven-collector"
+
+# Run prowler in workers forked from a forkserver with prowler preloaded, instead of `python3 -m prowler`
+PROWLER_WARM_WORKERS = True
+
+# Stream findings (options.stream_findings): aggregate the findings of each check while prowler runs.
+# Only a scan that is not sharded and runs in a warm worker streams its findings. Sharded scans (shard_by_region,
+# shard_by_check, shard_by_scope), cold processes (PROWLER_WARM_WORKERS off) and prowler versions without the
+# hooks of the workers read the OCSF output file after prowler exits, and log a warning.
+STREAM_FINDINGS = False
+
+# Check sharding: runtime assumed for checks without history and startup time of a prowler process (seconds)
+DEFAULT_CHECK_RUNTIME = 10.0
+PROWLER_STARTUP_TIME = 5.0
+
+# Max number of accounts scanned concurrently by batch collects in the plugin server process
+MAX_CONCURRENT_ACCOUNT_SCANS = 4
+# Responses of a batch collect buffered for its consumer. Account scans wait while the buffer is full.
+BATCH_RESPONSE_QUEUE_SIZE = 100
+
+# Scan cache (options.scan_cache): seconds until the cached findings of a check expire, by check severity
+SCAN_CACHE_TTL_BY_SEVERITY = {
+    "CRITICAL": 3600,
+    "HIGH": 3600 * 3,
+    "MEDIUM": 3600 * 6,
+    "LOW": 3600 * 12,
+    "INFORMATIONAL": 3600 * 24,
+}
+SCAN_CACHE_DEFAULT_TTL = 3600
+
+# Delta emission (options.delta_emission): unchanged records are fully emitted again after this interval (seconds)
+DELTA_FULL_RESEND_INTERVAL = 3600 * 24
+
+# Delta emission mode "suppress": an unchanged record is left out of at most this many consecutive collects.
+# garbage_collection of the inventory deletes a record that is missing from DEFAULT_DISCONNECTED_STATE_DELETE_POLICY
+# (3) collects in a row, so this must stay below that policy.
+DELTA_MAX_SUPPRESSED_COLLECTS = 2
+
+# Collect profiling (options.profile: cprofile | sampling): output directory and sampling interval (seconds)
+PROFILE_OUTPUT_DIR = "~/.spaceone/plugin-prowler-inven-collector/profiles"
+PROFILE_SAMPLING_INTERVAL = 0.01
+
+# Directory of the private per-scan credential files (tmpfs, falls back to the system temp directory)
+CREDENTIALS_TMP_DIR = "/dev/shm"
+
+# Assume role credentials (secret_data.role_arn): shared by all prowler processes of an account through a cache,
+# requested for STS_SESSION_DURATION seconds and refreshed STS_CREDENTIALS_REFRESH_MARGIN seconds before expiry.
+# The margin must exceed botocore's advisory refresh window (900s): within the window botocore re-runs the
+# credential_process on every credential access until it gets credentials that expire later.
+STS_SESSION_CACHE = True
+STS_SESSION_DURATION = 3600
+STS_CREDENTIALS_REFRESH_MARGIN = 1200
+
+# Captured prowler output: last stdout lines (and max length of a line) and last bytes of stderr
+PROWLER_OUTPUT_TAIL_LINES = 100
+PROWLER_OUTPUT_MAX_LINE_LENGTH = 4096
+PROWLER_STDERR_TAIL_BYTES = 64 * 1024
+
+# Shard checkpoints (options.checkpoint_shards): seconds a retried collect can resume a failed scan
+SHARD_CHECKPOINT_TTL = 3600 * 24
+
+# Deadlines of a scan (options.scan_timeout) and of each prowler process (options.shard_timeout) in seconds,
+# 0: no deadline. A prowler process past its deadline is terminated and killed after the grace period.
+PROWLER_SCAN_TIMEOUT = 0
+PROWLER_SHARD_TIMEOUT = 0
+PROWLER_TERMINATE_GRACE_PERIOD = 30
+
+# Worker processes that parse and aggregate the output files of a sharded scan (options.aggregation_workers),
+# 0: aggregate in the process of the collect
+AGGREGATION_WORKERS = 0
@@ -0,0 +1,201 @@
+import codecs
+import json
+import json.scanner
+import logging
+from typing import Generator
+
+import ijson
+
+from plugin.error.custom import ERROR_INVALID_PROWLER_OUTPUT
+
+__all__ = ["read_findings", "project_finding", "project_output_finding", "get_parser_name"]
+
+_LOGGER = logging.getLogger("spaceone")
+_READ_CHUNK_SIZE = 1024 * 1024
+_ARRAY_SEPARATORS = " \t\n\r,["
+# Fallback backends, fastest first
+_IJSON_BACKENDS = ["yajl2_c", "yajl2_cffi", "yajl2", "python"]
+_JSON_DECODER = json.JSONDecoder()
+# Severity names of OCSF (SeverityID) that prowler's OCSF output gives to the severities of prowler
+_OCSF_SEVERITIES = ("Informational", "Low", "Medium", "High", "Critical")
+
+
+def _get_ijson_backend():
+    for backend_name in _IJSON_BACKENDS:
+        try:
+            return ijson.get_backend(backend_name)
+        except ImportError:
+            continue
+    return ijson
+
+
+_IJSON_BACKEND = None if json.scanner.c_make_scanner else _get_ijson_backend()
+
+
+def get_parser_name() -> str:
+    if _IJSON_BACKEND is None:
+        return "json (C scanner)"
+    return f"ijson ({_IJSON_BACKEND.backend_name})"
+
+
+
+def read_findings(file, is_complete: bool = True) -> Generator[dict, None, None]:
+    """Read the findings of a prowler OCSF output (a JSON array) one by one, projected by project_finding.
+
+    Each array element is decoded by the C scanner of the json module, which is faster than building it from
+    ijson events. ijson is used only when the C scanner is not available.
+    An output that prowler has not written anything to has no findings. An output that does not decode raises
+    ERROR_INVALID_PROWLER_OUTPUT unless it may be incomplete (is_complete is False: prowler was terminated or
+    failed), in which case the findings before the error are read.
+    """
+    if _IJSON_BACKEND is None:
+        findings = _decode_array_items(file)
+    else:
+        findings = _IJSON_BACKEND.items(file, "item")
+
+    try:
+        for finding in findings:
+            yield project_finding(finding)
+    except (json.JSONDecodeError, ijson.IncompleteJSONError) as e:
+        position = getattr(e, "file_position", None)
+        if position is None:
+            # ijson reads ahead, so its position is the end of the data read so far
+            position = file.tell()
+            if position == 0:
+                return
+
+        _LOGGER.warning(f"[read_findings] output does not decode at byte {position}: {e}")
+        if is_complete:
+            raise ERROR_INVALID_PROWLER_OUTPUT(position=position, reason=e)
+
+
+def project_finding(finding: dict) -> dict:
+    """Keep only the fields of an OCSF finding that are used by ProwlerManager.
+
+    Resource details, tags and the other unused blobs are released as soon as the finding is read.
+    """
+    resource = finding["resources"][0]
+    remediation = finding["remediation"]
+
+    return {
+        "metadata": {"event_code": finding["metadata"]["event_code"]},
+        "cloud": {
+            "account": {"uid": finding["cloud"]["account"]["uid"]},
+            "region": finding["cloud"]["region"],
+        },
+        "unmapped": {
+            "check_type": finding["unmapped"]["check_type"],
+            "compliance": finding["unmapped"].get("compliance", {}),
+        },
+        "status_code": finding["status_code"],
+        "status_detail": finding["status_detail"],
+        "severity": finding["severity"],
+        "risk_details": finding["risk_details"],
+        "finding_info": {
+            "uid": finding["finding_info"]["uid"],
+            "title": finding["finding_info"]["title"],
+            "desc": finding["finding_info"]["desc"],
+        },
+        "resources": [
+            {
+                "name": resource["name"],
+                "uid": resource["uid"],
+                "type": resource["type"],
+                "group": {"name": resource["group"]["name"]},
+            }
+        ],
+        "remediation": {
+            "desc": remediation.get("desc", ""),
+            "references": remediation["references"],
+        },
+    }
+
+
+def project_output_finding(finding) -> dict:
+    """Project an output Finding of prowler like project_finding projects its OCSF finding.
+
+    The fields are mapped like prowler's OCSF output maps them, without writing and reading the output file.
+    """
+    severity = getattr(finding.severity, "value", finding.severity).capitalize()
+
+    return {
+        "metadata": {"event_code": finding.check_id},
+        "cloud": {
+            "account": {"uid": finding.account_uid},
+            "region": finding.region,
+        },
+        "unmapped": {
+            "check_type": finding.check_type,
+            "compliance": finding.compliance,
+        },
+        "status_code": getattr(finding.status, "value", finding.status),
+        "status_detail": finding.status_extended,
+        "severity": severity if severity in _OCSF_SEVERITIES else "Unknown",
+        "risk_details": finding.risk,
+        "finding_info": {
+            "uid": finding.finding_uid,
+            "title": finding.check_title,
+            "desc": finding.description,
+        },
+        "resources": [
+            {
+                "name": finding.resource_name,
+                "uid": finding.resource_uid,
+                "type": finding.resource_type,
+                "group": {"name": finding.service_name},
+            }
+        ],
+        "remediation": {
+            "desc": finding.remediation_recommendation_text or "",
+            "references": list(
+                filter(
+                    None,
+                    [
+                        finding.remediation_code_nativeiac,
+                        finding.remediation_code_terraform,
+                        finding.remediation_code_cli,
+                        finding.remediation_code_other,
+                        finding.remediation_recommendation_url,
+                    ],
+                )
+            ),
+        },
+    }
+
+
+def _decode_array_items(file) -> Generator[dict, None, None]:
+    # An element that is cut at the end of the buffer fails to decode and is decoded again with the next chunk.
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    pos = 0
+    read_size = 0
+    is_eof = False
+
+    while True:
+        buffer_size = len(buffer)
+        while pos < buffer_size and buffer[pos] in _ARRAY_SEPARATORS:
+            pos += 1
+
+        if pos < buffer_size:
+            if buffer[pos] == "]":
+                return
+
+            try:
+                finding, pos = _JSON_DECODER.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if is_eof:
+                    # Byte offset of the element that does not decode
+                    e.file_position = read_size - len(buffer[pos:].encode("utf-8"))
+                    raise
+            else:
+                yield finding
+                continue
+
+        if is_eof:
+            return
+
+        chunk = file.read(_READ_CHUNK_SIZE)
+        read_size += len(chunk)
+        is_eof = not chunk
+        buffer = buffer[pos:] + decoder.decode(chunk, final=is_eof)
+        pos = 0
@@ -1,18 +1,36 @@
 import os
 import logging
-import re
 import tempfile
 import subprocess
-import ijson
-from typing import List
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Generator, List
 
 from spaceone.core.connector import BaseConnector
-from plugin.conf.collector_conf import COMPLIANCE_FRAMEWORKS
+from plugin.conf.collector_conf import COMPLIANCE_FRAMEWORKS, REGIONS, GLOBAL_SERVICES, ACCOUNT_LEVEL_CHECKS
+from plugin.conf.global_conf import (
+    PROWLER_PROCESS_MEMORY_MB,
+    PROWLER_WARM_WORKERS,
+    STREAM_FINDINGS,
+    PROWLER_SCAN_TIMEOUT,
+    PROWLER_SHARD_TIMEOUT,
+    PROWLER_TERMINATE_GRACE_PERIOD,
+)
 
-__all__ = ["ProwlerConnector"]
+__all__ = ["ProwlerConnector", "ProwlerProcess"]
 
 from plugin.manager.aws_profile_manager import AWSProfileManager
 from plugin.manager.google_profile_manager import GoogleProfileManager
+from plugin.manager.check_scheduler import CheckScheduler
+from plugin.manager.admission_controller import AdmissionController, get_cpu_count, get_memory_limit
+from plugin.connector.ocsf_reader import read_findings, get_parser_name
+from plugin.connector.prowler_worker import ProwlerWorkerPool, PROWLER_COMMAND
+from plugin.connector.prowler_output import StdoutTail, StderrTail
+from plugin.manager.collect_tracer import CollectTracer
+from plugin.manager.scan_cache import ScanCache
+from plugin.manager.shard_checkpoint import ShardCheckpoint
+from plugin.manager.scope_enumerator import ScopeEnumerator
 
 _LOGGER = logging.getLogger("spaceone")
 _AZURE_CREDENTIAL_ENVS = {
@@ -22,6 +40,10 @@ _AZURE_CREDENTIAL_ENVS = {
 }
 CURRENT_DIR = os.path.dirname(__file__)
 METADATA_DIR = os.path.join(CURRENT_DIR, "../metadata/checks/")
+_SCOPE_FILTER_OPTIONS = {
+    "azure": "--subscription-ids",
+    "google_cloud": "--project-ids",
+}
 
 
 class ProwlerConnector(BaseConnector):
@@ -29,77 +51,384 @@ class ProwlerConnector(BaseConnector):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._temp_dir = None
+        self.tracer = CollectTracer()
+        self.timed_out = []
+        self._scan_deadline = None
+        self._shard_timeout = None
+        # Aggregates the output files of shards in worker processes instead of yielding their findings
+        self.partial_aggregator = None
+        # Set by stop(): no prowler process starts any more. Shared by the collect that owns the connector.
+        self.stop_event = threading.Event()
+        # Prowler processes of the scan, terminated when the scan is stopped
+        self._processes = set()
+        self._processes_lock = threading.Lock()
 
-    def check(self, options: dict, secret_data: dict):
+    def check(self, options: dict, secret_data: dict, compliance_checks: List[str] = None):
         provider = options.get("provider")
-        regions = options.get("regions", [])
-        checklist = options.get("check_list", [])
-        compliance_framework = COMPLIANCE_FRAMEWORKS[provider].get(options["compliance_framework"])
+        _LOGGER.debug(f"[check] OCSF parser: {get_parser_name()}")
+
+        checkpoint = self._get_checkpoint(options, secret_data, compliance_checks)
+        scopes = self._list_scopes(options, secret_data)
+
+        # options.scan_timeout bounds the whole scan, options.shard_timeout each prowler process of it
+        self.timed_out = []
+        scan_timeout = options.get("scan_timeout", PROWLER_SCAN_TIMEOUT)
+        self._scan_deadline = time.monotonic() + scan_timeout if scan_timeout else None
+        self._shard_timeout = options.get("shard_timeout", PROWLER_SHARD_TIMEOUT) or None
 
         with tempfile.TemporaryDirectory() as temp_dir:
-            err_message = None
-            last_line = None
             if provider == "aws":
-                with AWSProfileManager(secret_data) as aws_profile:
+                with AWSProfileManager(secret_data, self.tracer) as aws_profile:
                     cmd = self._command_prefix(provider, aws_profile.profile_name)
-                    cmd += self._get_collect_command(temp_dir, compliance_framework, regions, checklist)
-                    _LOGGER.debug(f"[check] command: {cmd}")
-
-                    response = subprocess.run(
-                        cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE
-                    )
-                    if response.returncode != 0:
-                        err_message = response.stderr.decode("utf-8")
-                    last_line = response.stdout.decode("utf-8").strip().split('\n')[-1]
+                    sub_process_env = dict(os.environ, **aws_profile.env)
+                    yield from self._scan(cmd, temp_dir, options, compliance_checks, sub_process_env, checkpoint, scopes)
             elif provider == "azure":
                 cmd = self._command_prefix(provider, None)
-                cmd += self._get_collect_command(temp_dir, compliance_framework, regions, checklist)
-                _LOGGER.debug(f"[check] command: {cmd}")
-
                 sub_process_env = self.get_sub_process_env(secret_data)
-
-                with subprocess.Popen(
-                        cmd,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE,
-                        env=sub_process_env,
-                ) as sub_process:
-                    response, err_response = sub_process.communicate()
-
-                    if sub_process.returncode != 0:
-                        err_message = err_response.decode("utf-8")
-                    last_line = response.decode("utf-8").strip().split('\n')[-1]
+                yield from self._scan(cmd, temp_dir, options, compliance_checks, sub_process_env, checkpoint, scopes)
             elif provider == "google_cloud":
-                with GoogleProfileManager(secret_data) as google_profile:
+                with GoogleProfileManager(secret_data, self.tracer) as google_profile:
                     cmd = self._command_prefix(provider, google_profile.source_profile_path)
-                    cmd += self._get_collect_command(temp_dir, compliance_framework, regions, checklist)
-                    _LOGGER.debug(f"[check] command: {cmd}")
-
-                    response = subprocess.run(
-                        cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE
-                    )
-                    if response.returncode != 0:
-                        err_message = response.stderr.decode("utf-8")
-                    last_line = response.stdout.decode("utf-8").strip().split('\n')[-1]
-            last_message = re.sub(r'\x1b\[[0-9;]*m','',last_line)
-
-            if 'there are no findings' in last_message.lower():
-                yield {}, last_message
-            else:
-                output_json_file = os.path.join(temp_dir, "output.ocsf.json")
-                if os.path.exists(output_json_file):
-                    with open(output_json_file,'rb') as file:
-                        objects = ijson.items(file, 'item')
-                        obj = next(objects, None)
-                        while obj is not None:
-                            yield obj, err_message
-                            obj = next(objects, None)
-                else:
-                    yield {}, err_message
+                    sub_process_env = dict(os.environ, **google_profile.env)
+                    yield from self._scan(cmd, temp_dir, options, compliance_checks, sub_process_env, checkpoint, scopes)
+
+    def _scan(
+            self, cmd_prefix: List[str], temp_dir: str, options: dict, compliance_checks: List[str] = None,
+            env: dict = None, checkpoint: ShardCheckpoint = None, scopes: List[str] = None
+    ):
+        provider = options.get("provider")
+        regions = options.get("regions", [])
+        checklist = options.get("check_list", [])
+        max_workers = options.get("max_workers")
+        stream_findings = options.get("stream_findings", STREAM_FINDINGS)
+        compliance_frameworks = [
+            COMPLIANCE_FRAMEWORKS[provider].get(compliance_framework)
+            for compliance_framework in ProwlerConnector.get_compliance_frameworks(options)
+        ]
+
+        shard_by_region = provider == "aws" and options.get("shard_by_region", False)
+        shard_by_check = options.get("shard_by_check", False)
+        if stream_findings and (shard_by_region or shard_by_check or scopes):
+            _LOGGER.warning("[ProwlerConnector] sharded scans do not stream findings, read them from the output files")
+
+        if shard_by_region:
+            shards = self._make_region_shards(provider, regions, checklist or compliance_checks or [], max_workers)
+            yield from self._execute_shards(
+                cmd_prefix, temp_dir, compliance_frameworks, shards, max_workers, env, checkpoint
+            )
+        elif shard_by_check:
+            check_scheduler = CheckScheduler(provider)
+            check_groups = check_scheduler.schedule(
+                checklist or compliance_checks or [], max_workers or self.get_default_max_workers()
+            )
+            shards = [
+                {"name": f"checks-{i}", "regions": regions, "checks": check_group}
+                for i, check_group in enumerate(check_groups)
+            ]
+            yield from self._execute_shards(
+                cmd_prefix, temp_dir, compliance_frameworks, shards, max_workers, env, checkpoint
+            )
+
+            for shard in shards:
+                if shard.get("returncode") == 0:
+                    check_scheduler.record(shard["checks"], shard["duration"])
+            check_scheduler.save()
+        elif scopes:
+            shards = self._make_scope_shards(provider, scopes, regions, checklist, max_workers)
+            yield from self._execute_shards(
+                cmd_prefix, temp_dir, compliance_frameworks, shards, max_workers, env, checkpoint
+            )
+        else:
+            cmd = cmd_prefix + self._get_collect_command(temp_dir, compliance_frameworks, regions, checklist)
+            yield from self._execute(
+                cmd, temp_dir, stream_findings, env, checklist or compliance_checks, regions
+            )
+
+    def _execute(
+            self, cmd: List[str], temp_dir: str, stream_findings: bool, env: dict = None, checks: List[str] = None,
+            regions: List[str] = None
+    ):
+        prowler_process = ProwlerProcess(cmd, temp_dir, env, stream_findings)
+        if not prowler_process.start(self._scan_deadline, self._shard_timeout, self.stop_event):
+            return
+
+        self._add_process(prowler_process)
+        try:
+            if prowler_process.stream_findings:
+                # Findings of each check arrive as soon as prowler has run the check
+                for obj in self.tracer.trace_iterator("parse", prowler_process.read_findings()):
+                    yield obj, None
+        except BaseException:
+            # The consumer closed the generator (canceled collect or an aggregation error):
+            # prowler must not outlive the credentials of the scan
+            prowler_process.stop()
+            raise
+        finally:
+            # Releases the admission of the process
+            prowler_process.wait()
+            self._remove_process(prowler_process)
+
+        self._trace_process(prowler_process)
+        err_message = prowler_process.err_message
+        if prowler_process.timed_out:
+            self._add_timed_out(checks, regions)
+
+        if prowler_process.has_no_findings:
+            yield {}, prowler_process.last_message
+        elif prowler_process.stream_findings:
+            yield {}, err_message
+        elif os.path.exists(prowler_process.output_json_file):
+            with open(prowler_process.output_json_file, 'rb') as file:
+                for obj, _ in self._read_findings(file, self.tracer, prowler_process.returncode == 0):
+                    yield obj, err_message
+        else:
+            yield {}, err_message
+
+    def _execute_shards(
+            self, cmd_prefix: List[str], temp_dir: str, compliance_frameworks: List[str], shards: List[dict],
+            max_workers: int = None, env: dict = None, checkpoint: ShardCheckpoint = None
+    ):
+        if checkpoint:
+            # A resumed scan runs the shards of its checkpoint. They replace the caller's shards, so that the
+            # caller sees the returncode and duration of the shards that actually ran.
+            shards[:] = checkpoint.get_shards(shards)
+
+        max_workers = max(1, min(max_workers or self.get_default_max_workers(), len(shards)))
+        _LOGGER.debug(f"[_execute_shards] shards: {len(shards)}, max_workers: {max_workers}")
+
+        err_messages = []
+        no_findings_message = None
+        has_findings = False
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            try:
+                for shard in shards:
+                    if checkpoint and checkpoint.is_completed(shard):
+                        continue
+
+                    shard_dir = os.path.join(temp_dir, shard["name"])
+                    os.makedirs(shard_dir, exist_ok=True)
+                    cmd = cmd_prefix + self._get_collect_command(
+                        shard_dir, compliance_frameworks, shard["regions"], shard["checks"]
+                    ) + shard.get("scope_filter", [])
+                    futures[executor.submit(self._run_shard, shard, cmd, shard_dir, env)] = shard
+
+                # Findings of the shards completed by a previous collect are read while the other shards run
+                for shard in shards:
+                    if checkpoint and checkpoint.is_completed(shard):
+                        for obj in self.tracer.trace_iterator("checkpoint_read", checkpoint.read_findings(shard)):
+                            has_findings = True
+                            yield obj, None
+
+                # Each shard's output is parsed as soon as it completes, while the other shards are still running
+                for future in as_completed(futures):
+                    shard = futures[future]
+                    prowler_process = future.result()
+                    if prowler_process is None:
+                        # The scan deadline passed (or the scan was stopped) before the shard could start
+                        self._add_timed_out(shard["checks"], shard["regions"])
+                        continue
+
+                    self._trace_process(prowler_process)
+                    if prowler_process.timed_out:
+                        self._add_timed_out(shard["checks"], shard["regions"])
+                    if prowler_process.err_message:
+                        err_messages.append(prowler_process.err_message)
+
+                    # The output of a shard that did not exit 0 may be cut off
+                    is_complete = prowler_process.returncode == 0
+                    if prowler_process.has_no_findings:
+                        no_findings_message = prowler_process.last_message
+                    elif os.path.exists(prowler_process.output_json_file) and self.partial_aggregator and not checkpoint:
+                        self.partial_aggregator.submit(prowler_process.output_json_file, is_complete)
+                        has_findings = True
+                    elif os.path.exists(prowler_process.output_json_file):
+                        with open(prowler_process.output_json_file, 'rb') as file:
+                            findings = (obj for obj, _ in self._read_findings(file, self.tracer, is_complete))
+                            if checkpoint and is_complete:
+                                findings = checkpoint.write_findings(shard, findings)
+
+                            for obj in findings:
+                                has_findings = True
+                                yield obj, None
+
+                    if checkpoint:
+                        if prowler_process.returncode == 0:
+                            checkpoint.complete(shard)
+                        else:
+                            checkpoint.discard(shard)
+            except BaseException:
+                # The consumer closed the generator: the executor would otherwise wait for every shard
+                self._stop_shards(futures)
+                raise
+
+        # Output files are removed with the temporary directory of the scan
+        if self.partial_aggregator:
+            self.partial_aggregator.wait()
+
+        if checkpoint and not err_messages and not self.timed_out:
+            checkpoint.remove()
+
+        if not has_findings and no_findings_message:
+            yield {}, no_findings_message
+        else:
+            yield {}, "\n".join(err_messages) or None
+
+    @staticmethod
+    def _get_checkpoint(options: dict, secret_data: dict, compliance_checks: List[str] = None) -> ShardCheckpoint:
+        """options.checkpoint_shards: checkpoint the shards of a sharded scan (shard_by_region, _check or _scope)"""
+        if not options.get("checkpoint_shards", False):
+            return None
+        if not any(options.get(key, False) for key in ["shard_by_region", "shard_by_check", "shard_by_scope"]):
+            return None
+
+        scan_key = ShardCheckpoint.make_scan_key(
+            ScanCache.make_scope_key(secret_data, options.get("regions")),
+            ProwlerConnector.get_compliance_frameworks(options),
+            sorted(options.get("check_list") or compliance_checks or []),
+            options.get("shard_by_region", False),
+            options.get("shard_by_check", False),
+            options.get("shard_by_scope", False),
+        )
+        return ShardCheckpoint(options.get("provider"), scan_key)
+
+    def _list_scopes(self, options: dict, secret_data: dict) -> List[str]:
+        """options.shard_by_scope: list the Azure subscriptions or GCP projects of the scan to run them concurrently"""
+        provider = options.get("provider")
+        if not options.get("shard_by_scope", False) or provider not in _SCOPE_FILTER_OPTIONS:
+            return None
+
+        try:
+            with self.tracer.span("scope_enumeration"):
+                scopes = ScopeEnumerator(provider, secret_data).list_scopes()
+        except Exception as e:
+            # Prowler lists the scopes itself and reports the error of the credentials
+            _LOGGER.warning(f"[_list_scopes] failed to list scopes, scan without scope shards: {e}")
+            return None
+
+        # A single scope runs in a single prowler process anyway
+        return scopes if len(scopes) > 1 else None
+
+    def _add_timed_out(self, checks: List[str], regions: List[str]) -> None:
+        """Record the checks and regions of a prowler process that did not finish before its deadline"""
+        _LOGGER.warning(f"[ProwlerConnector] scan timed out: checks={checks or 'all'}, regions={regions or 'all'}")
+        self.timed_out.append({"checks": checks or [], "regions": regions or []})
+
+    def _run_shard(
+            self, shard: dict, cmd: List[str], output_dir: str, env: dict = None
+    ) -> "ProwlerProcess":
+        if self.stop_event.is_set() or (self._scan_deadline and time.monotonic() >= self._scan_deadline):
+            return None
+
+        prowler_process = ProwlerProcess(cmd, output_dir, env)
+        if not prowler_process.start(self._scan_deadline, self._shard_timeout, self.stop_event):
+            return None
+
+        self._add_process(prowler_process)
+        try:
+            shard["returncode"] = prowler_process.wait()
+        finally:
+            self._remove_process(prowler_process)
+
+        shard["duration"] = prowler_process.duration
+        return prowler_process
+
+    def stop(self) -> None:
+        """Stop the scan, also from another thread (the collect was canceled).
+
+        Prowler processes that have not started do not start, and the running ones are terminated.
+        """
+        self.stop_event.set()
+        with self._processes_lock:
+            processes = list(self._processes)
+        for prowler_process in processes:
+            prowler_process.stop()
+
+    def _stop_shards(self, futures: dict) -> None:
+        """Cancel the shards that have not started and terminate the running ones"""
+        for future in futures:
+            future.cancel()
+        self.stop()
+
+    def _add_process(self, prowler_process: "ProwlerProcess") -> None:
+        with self._processes_lock:
+            self._processes.add(prowler_process)
+
+        # The scan may have been stopped while the process was starting
+        if self.stop_event.is_set():
+            prowler_process.stop()
+
+    def _remove_process(self, prowler_process: "ProwlerProcess") -> None:
+        with self._processes_lock:
+            self._processes.discard(prowler_process)
+
+    @staticmethod
+    def _make_region_shards(provider: str, regions: List[str], checks: List[str], max_workers: int = None) -> List[dict]:
+        """Split a scan into one shard for global checks and up to max_workers shards of regional checks.
+
+        Global checks report a single account-level finding in the default region of the process,
+        so they run once over all regions instead of once per shard.
+        """
+        global_checks = [
+            check_id for check_id in checks
+            if check_id.split("_")[0] in GLOBAL_SERVICES[provider] or check_id in ACCOUNT_LEVEL_CHECKS[provider]
+        ]
+        regional_checks = [check_id for check_id in checks if check_id not in global_checks]
+        all_regions = regions or REGIONS[provider]
+        shard_count = min(max_workers or ProwlerConnector.get_default_max_workers(), len(all_regions))
+
+        shards = []
+        if global_checks:
+            shards.append({"name": "global", "regions": regions, "checks": global_checks})
+
+        if regional_checks:
+            for i in range(shard_count):
+                shards.append(
+                    {"name": f"regional-{i}", "regions": all_regions[i::shard_count], "checks": regional_checks}
+                )
+
+        return shards
+
+    @staticmethod
+    def _make_scope_shards(
+            provider: str, scopes: List[str], regions: List[str], checks: List[str], max_workers: int = None
+    ) -> List[dict]:
+        """Split a scan into up to max_workers groups of subscriptions or projects."""
+        shard_count = min(max_workers or ProwlerConnector.get_default_max_workers(), len(scopes))
+        return [
+            {
+                "name": f"scopes-{i}",
+                "regions": regions,
+                "checks": checks,
+                "scope_filter": [_SCOPE_FILTER_OPTIONS[provider]] + scopes[i::shard_count],
+            }
+            for i in range(shard_count)
+        ]
+
+    @staticmethod
+    def get_default_max_workers() -> int:
+        """Number of concurrent prowler processes that fit into the CPU and memory of this node."""
+        memory_mb = get_memory_limit() // (1024 * 1024)
+        return max(1, min(get_cpu_count(), memory_mb // PROWLER_PROCESS_MEMORY_MB))
+
+    def _trace_process(self, prowler_process: "ProwlerProcess") -> None:
+        self.tracer.add("admission_wait", prowler_process.admission.wait_time)
+        self.tracer.add("prowler", prowler_process.duration)
+
+    @staticmethod
+    def _read_findings(file, tracer: CollectTracer = None, is_complete: bool = True):
+        # An empty output file means that prowler did not write any finding.
+        # The output of a prowler that did not exit 0 (terminated or failed) may be cut off.
+        findings = read_findings(file, is_complete)
+        if tracer:
+            findings = tracer.trace_iterator("parse", findings)
+
+        for obj in findings:
+            yield obj, None
 
     @staticmethod
     def _command_prefix(provider: str, profile_name: str) -> List[str]:
-        cmd = ["python3", "-m", "prowler", ]
+        cmd = list(PROWLER_COMMAND)
 
         if provider == "aws":
             cmd += ["aws", "-p", profile_name, "-b"]
@@ -111,14 +440,16 @@ class ProwlerConnector(BaseConnector):
         return cmd
 
     @staticmethod
-    def _get_collect_command(temp_dir: str, compliance_framework: str, regions, checklist: List[str]) -> List[str]:
+    def _get_collect_command(
+            temp_dir: str, compliance_frameworks: List[str], regions, checklist: List[str]
+    ) -> List[str]:
         cmd = ["-M", "json-ocsf", "-o", temp_dir, "-F", "output", "-z"]
 
         if checklist:
             checklist_filter = ["--check"] + checklist
             cmd += checklist_filter
         else:
-            cmd += ["--compliance", compliance_framework]
+            cmd += ["--compliance"] + compliance_frameworks
 
         if regions:
             region_filter = ["-f"] + regions
@@ -128,6 +459,11 @@ class ProwlerConnector(BaseConnector):
 
         return cmd
 
+    @staticmethod
+    def get_compliance_frameworks(options: dict) -> List[str]:
+        """options.compliance_frameworks scans several frameworks at once, otherwise options.compliance_framework"""
+        return options.get("compliance_frameworks") or [options["compliance_framework"]]
+
     @staticmethod
     def get_sub_process_env(secret_data: dict):
         sub_process_env = os.environ.copy()
@@ -135,3 +471,141 @@ class ProwlerConnector(BaseConnector):
             sub_process_env[value] = secret_data[key]
 
         return sub_process_env
+
+
+class ProwlerProcess:
+    """Runs a prowler command, in a warm worker unless PROWLER_WARM_WORKERS is off, and drains its stdout and stderr."""
+
+    def __init__(self, cmd: List[str], output_dir: str, env: dict = None, stream_findings: bool = False):
+        self.cmd = cmd
+        self.output_json_file = os.path.join(output_dir, "output.ocsf.json")
+        self.env = env
+        # Only warm workers can send their findings; otherwise they are read from output_json_file
+        self.stream_findings = stream_findings
+        self.sub_process = None
+        self.admission = None
+        self.start_time = None
+        self.duration = None
+        self.stdout_tail = StdoutTail()
+        self.stderr_tail = StderrTail()
+        self.timed_out = False
+        self._pipe_readers = []
+        self._watchdog = None
+
+    def start(self, deadline: float = None, timeout: float = None, stop_event: threading.Event = None) -> bool:
+        """Start prowler. It is terminated at the deadline (time.monotonic()) or timeout seconds after it starts.
+
+        Returns False without starting prowler if stop_event is set while it waits for admission.
+        """
+        # Blocks until the node has room for another prowler process
+        self.admission = AdmissionController.get_instance().acquire(stop_event=stop_event)
+        if self.admission is None:
+            return False
+
+        _LOGGER.debug(f"[ProwlerProcess] command: {self.cmd} (wait_time: {self.admission.wait_time:.2f}s)")
+        self.start_time = time.time()
+        try:
+            if PROWLER_WARM_WORKERS and ProwlerWorkerPool.is_available():
+                worker_pool = ProwlerWorkerPool.get_instance()
+                self.stream_findings = self.stream_findings and worker_pool.can_stream_findings()
+                self.sub_process = worker_pool.start(self.cmd, self.env, self.stream_findings)
+            else:
+                if self.stream_findings:
+                    _LOGGER.warning("[ProwlerProcess] cold processes do not stream findings, read them from the output file")
+                    self.stream_findings = False
+                self.sub_process = subprocess.Popen(
+                    self.cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    env=self.env,
+                )
+        except Exception:
+            AdmissionController.get_instance().release(self.admission)
+            raise
+
+        # Otherwise prowler blocks on a full pipe while findings are consumed from the output file
+        self._pipe_readers = [
+            threading.Thread(target=self._read_pipe, args=(self.sub_process.stdout, self.stdout_tail), daemon=True),
+            threading.Thread(target=self._read_pipe, args=(self.sub_process.stderr, self.stderr_tail), daemon=True),
+        ]
+        for pipe_reader in self._pipe_readers:
+            pipe_reader.start()
+
+        if timeout:
+            deadline = min(deadline or float("inf"), time.monotonic() + timeout)
+        if deadline:
+            self._watchdog = threading.Timer(max(deadline - time.monotonic(), 0), self._terminate)
+            self._watchdog.daemon = True
+            self._watchdog.start()
+
+        return True
+
+    def read_findings(self) -> Generator[dict, None, None]:
+        """Findings sent by the warm worker (stream_findings) while prowler runs, check by check."""
+        return self.sub_process.read_findings()
+
+    def wait(self) -> int:
+        try:
+            self.sub_process.wait()
+        finally:
+            if self._watchdog:
+                self._watchdog.cancel()
+            AdmissionController.get_instance().release(self.admission)
+
+        for pipe_reader in self._pipe_readers:
+            pipe_reader.join()
+        self.sub_process.stdout.close()
+        self.sub_process.stderr.close()
+        if self.stream_findings:
+            self.sub_process.findings.close()
+        self.duration = time.time() - self.start_time
+        return self.sub_process.returncode
+
+    @property
+    def returncode(self) -> int:
+        return self.sub_process.returncode
+
+    @property
+    def err_message(self) -> str:
+        # A timed out scan is not an error: its checks are reported as partial compliance results
+        if self.returncode != 0 and not self.timed_out:
+            return self.stderr_tail.getvalue()
+        return None
+
+    @property
+    def last_message(self) -> str:
+        return self.stdout_tail.last_line
+
+    @property
+    def has_no_findings(self) -> bool:
+        return self.stdout_tail.has_no_findings
+
+    def stop(self) -> None:
+        """Terminate prowler whose findings are no longer read (the collect was canceled or failed)."""
+        if self.sub_process.poll() is not None:
+            return
+
+        _LOGGER.warning(f"[ProwlerProcess] scan stopped, terminate prowler: {self.cmd}")
+        self._shutdown()
+
+    def _terminate(self) -> None:
+        if self.sub_process.poll() is not None:
+            return
+
+        _LOGGER.warning(f"[ProwlerProcess] deadline exceeded, terminate prowler: {self.cmd}")
+        self.timed_out = True
+        self._shutdown()
+
+    def _shutdown(self) -> None:
+        self.sub_process.terminate()
+        try:
+            self.sub_process.wait(PROWLER_TERMINATE_GRACE_PERIOD)
+        except subprocess.TimeoutExpired:
+            _LOGGER.warning(f"[ProwlerProcess] prowler did not exit in {PROWLER_TERMINATE_GRACE_PERIOD}s, kill it")
+            self.sub_process.kill()
+
+    @staticmethod
+    def _read_pipe(pipe, tail):
+        for chunk in iter(lambda: pipe.read1(65536), b""):
+            tail.write(chunk)
+        tail.close()
@@ -0,0 +1,86 @@
+import re
+import logging
+from collections import deque
+
+from plugin.conf.global_conf import PROWLER_OUTPUT_TAIL_LINES, PROWLER_OUTPUT_MAX_LINE_LENGTH, PROWLER_STDERR_TAIL_BYTES
+
+__all__ = ["StdoutTail", "StderrTail"]
+
+_LOGGER = logging.getLogger("spaceone")
+_LINE_SEPARATOR = re.compile(rb"[\r\n]")
+_ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]")
+_NO_FINDINGS_MARKER = "there are no findings"
+_CHECK_COUNT_PATTERN = re.compile(r"Executing (\d+) checks?")
+_PROGRESS_PATTERN = re.compile(r"(\d+)/(\d+) \[\d+%\]")
+
+
+class StdoutTail:
+    """Keeps the last PROWLER_OUTPUT_TAIL_LINES lines of prowler's stdout and scans every line as it arrives.
+
+    Memory does not depend on the log volume of prowler: lines are split on '\\n' and on the '\\r' of the
+    progress bar, and a line longer than PROWLER_OUTPUT_MAX_LINE_LENGTH keeps only its end.
+    """
+
+    def __init__(self, max_lines: int = PROWLER_OUTPUT_TAIL_LINES):
+        self.lines = deque(maxlen=max_lines)
+        self.has_no_findings = False
+        self.check_count = None
+        self.progress = None
+        self._partial_line = b""
+
+    def write(self, chunk: bytes) -> None:
+        lines = _LINE_SEPARATOR.split(self._partial_line + chunk)
+        self._partial_line = lines.pop()[-PROWLER_OUTPUT_MAX_LINE_LENGTH:]
+        for line in lines:
+            self._add_line(line)
+
+    def close(self) -> None:
+        if self._partial_line:
+            self._add_line(self._partial_line)
+            self._partial_line = b""
+
+    @property
+    def last_line(self) -> str:
+        return self.lines[-1] if self.lines else ""
+
+    def _add_line(self, line: bytes) -> None:
+        line = _ANSI_ESCAPE.sub("", line[-PROWLER_OUTPUT_MAX_LINE_LENGTH:].decode("utf-8", "replace")).strip()
+        if not line:
+            return
+
+        self.lines.append(line)
+
+        if _NO_FINDINGS_MARKER in line.lower():
+            self.has_no_findings = True
+        elif self.check_count is None and (match := _CHECK_COUNT_PATTERN.search(line)):
+            self.check_count = int(match.group(1))
+        elif match := _PROGRESS_PATTERN.search(line):
+            progress = (int(match.group(1)), int(match.group(2)))
+            if progress != self.progress:
+                self.progress = progress
+                _LOGGER.debug(f"[StdoutTail] progress: {progress[0]}/{progress[1]} checks")
+
+
+class StderrTail:
+    """Keeps the last PROWLER_STDERR_TAIL_BYTES bytes of prowler's stderr."""
+
+    def __init__(self, max_bytes: int = PROWLER_STDERR_TAIL_BYTES):
+        self.max_bytes = max_bytes
+        self.is_truncated = False
+        self._buffer = bytearray()
+
+    def write(self, chunk: bytes) -> None:
+        self._buffer += chunk
+        if len(self._buffer) > self.max_bytes:
+            del self._buffer[:len(self._buffer) - self.max_bytes]
+            self.is_truncated = True
+
+    def close(self) -> None:
+        pass
+
+    def getvalue(self) -> str:
+        value = self._buffer.decode("utf-8", "replace")
+        if self.is_truncated:
+            # The first line is cut, so the message starts at the next complete line
+            value = f"(stderr truncated to the last {self.max_bytes} bytes)\n{value.split(chr(10), 1)[-1]}"
+        return value
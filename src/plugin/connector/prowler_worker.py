@@ -0,0 +1,274 @@
+import os
+import sys
+import logging
+import importlib
+import subprocess
+import threading
+import multiprocessing
+from multiprocessing.connection import Connection, wait
+from typing import Generator, List
+
+__all__ = ["ProwlerWorkerPool", "ProwlerWorker", "PROWLER_COMMAND"]
+
+_LOGGER = logging.getLogger("spaceone")
+# The main module (the spaceone CLI) is imported once by the forkserver instead of by every worker
+_FORKSERVER_PRELOAD = ["__main__", "prowler.__main__", "plugin.connector.prowler_worker"]
+
+# Command of a cold prowler process, replaced by a worker forked from the warm forkserver
+PROWLER_COMMAND = ["python3", "-m", "prowler"]
+
+# Internals of prowler (4.4) that a worker hooks to send its findings (_send_findings)
+_FINDINGS_HOOKS = [
+    "prowler.lib.check.check.report",
+    "prowler.lib.outputs.finding.Finding.generate_output",
+    "prowler.__main__.Finding",
+    "prowler.__main__.OCSF",
+]
+
+
+def _run_prowler(
+        args: List[str], env: dict, stdout: Connection, stderr: Connection, findings: Connection = None
+) -> None:
+    """Entry point of a worker: runs prowler's CLI entry point as `python3 -m prowler <args>` would.
+
+    sys.exit() of prowler becomes the exit code of the worker, like the exit code of the cold process.
+    With findings, the findings of each check are sent through it instead of the OCSF output file.
+    """
+    os.dup2(stdout.fileno(), 1)
+    os.dup2(stderr.fileno(), 2)
+    stdout.close()
+    stderr.close()
+
+    os.environ.clear()
+    os.environ.update(env)
+    sys.argv = ["prowler"] + args
+
+    from prowler.__main__ import prowler
+
+    if findings is not None:
+        _send_findings(findings)
+
+    prowler()
+
+
+def _get_missing_hooks() -> List[str]:
+    """Hooks of _FINDINGS_HOOKS that the installed prowler does not have"""
+    missing_hooks = []
+    for hook in _FINDINGS_HOOKS:
+        module_name, *attributes = hook.split(".")
+        try:
+            # The longest importable prefix is the module, the rest are attributes
+            while attributes:
+                try:
+                    obj = importlib.import_module(f"{module_name}.{attributes[0]}")
+                except ModuleNotFoundError:
+                    obj = importlib.import_module(module_name)
+                    break
+                module_name = f"{module_name}.{attributes.pop(0)}"
+
+            for attribute in attributes:
+                obj = getattr(obj, attribute)
+        except (ImportError, AttributeError):
+            missing_hooks.append(hook)
+
+    return missing_hooks
+
+
+def _send_missing_hooks(connection: Connection) -> None:
+    """Entry point of the worker that checks the hooks in the forkserver's prowler"""
+    connection.send(_get_missing_hooks())
+    connection.close()
+
+
+def _send_findings(findings: Connection) -> None:
+    """Send the projected findings of each check through findings as soon as prowler reports the check.
+
+    Prowler's report() of each check is wrapped in this worker only, since every scan is a fresh fork.
+    The output Finding of each finding is made once and reused by prowler's outputs at the end of the
+    scan, and the OCSF output file is not written.
+    """
+    import prowler.__main__ as prowler_main
+    from prowler.lib.check import check
+    from prowler.lib.outputs.finding import Finding
+    from plugin.connector.ocsf_reader import project_output_finding
+
+    report = check.report
+    finding_outputs = {}
+
+    def report_and_send(check_findings, provider, output_options):
+        # report() sorts the findings like the OCSF output file
+        report(check_findings, provider, output_options)
+
+        projected_findings = []
+        for check_finding in check_findings:
+            finding_output = Finding.generate_output(provider, check_finding, output_options)
+            finding_outputs[id(check_finding)] = finding_output
+            if finding_output is not None:
+                projected_findings.append(project_output_finding(finding_output))
+        findings.send(projected_findings)
+
+    class ReportedFinding:
+        @staticmethod
+        def generate_output(provider, check_finding, output_options):
+            if id(check_finding) in finding_outputs:
+                return finding_outputs.pop(id(check_finding))
+            return Finding.generate_output(provider, check_finding, output_options)
+
+    check.report = report_and_send
+    prowler_main.Finding = ReportedFinding
+    prowler_main.OCSF = _SentOCSFOutput
+
+
+class _SentOCSFOutput:
+    """Replaces prowler's OCSF output in a worker that sends its findings instead of writing them"""
+
+    def __init__(self, *args, **kwargs):
+        self.data = []
+
+    def batch_write_data_to_file(self) -> None:
+        pass
+
+
+class ProwlerWorker:
+    """Popen-like handle of a prowler run in a process forked from the forkserver.
+
+    stdout and stderr are pipes read the same way as the pipes of a subprocess.Popen.
+    """
+
+    def __init__(
+            self, context: multiprocessing.context.BaseContext, args: List[str], env: dict, stream_findings: bool = False
+    ):
+        self.args = args
+        # The worker is reaped by one thread at a time (wait of the scan and the deadline watchdog)
+        self._lock = threading.Lock()
+        stdout_r, stdout_w = os.pipe()
+        stderr_r, stderr_w = os.pipe()
+        self.stdout = os.fdopen(stdout_r, "rb")
+        self.stderr = os.fdopen(stderr_r, "rb")
+        # Findings sent by the worker check by check (stream_findings)
+        self.findings, findings = context.Pipe(duplex=False) if stream_findings else (None, None)
+
+        stdout = Connection(stdout_w, readable=False)
+        stderr = Connection(stderr_w, readable=False)
+        try:
+            self._process = context.Process(target=_run_prowler, args=(args, env, stdout, stderr, findings))
+            self._process.start()
+        except Exception:
+            self.stdout.close()
+            self.stderr.close()
+            if self.findings is not None:
+                self.findings.close()
+            raise
+        finally:
+            # The worker has its own copies, so the pipes reach EOF when it exits
+            stdout.close()
+            stderr.close()
+            if findings is not None:
+                findings.close()
+
+    @property
+    def pid(self) -> int:
+        return self._process.pid
+
+    @property
+    def returncode(self) -> int:
+        return self.poll()
+
+    def poll(self) -> int:
+        with self._lock:
+            return self._process.exitcode
+
+    def wait(self, timeout: float = None) -> int:
+        if not wait([self._process.sentinel], timeout):
+            raise subprocess.TimeoutExpired(self.args, timeout)
+
+        with self._lock:
+            self._process.join()
+            return self._process.exitcode
+
+    def read_findings(self) -> Generator[dict, None, None]:
+        """Findings sent by the worker, until it exits"""
+        try:
+            while True:
+                try:
+                    check_findings = self.findings.recv()
+                except EOFError:
+                    return
+                yield from check_findings
+        finally:
+            self.findings.close()
+
+    def terminate(self) -> None:
+        self._process.terminate()
+
+    def kill(self) -> None:
+        self._process.kill()
+
+
+class ProwlerWorkerPool:
+    """Starts prowler runs from a forkserver that has already imported prowler.
+
+    `python3 -m prowler` imports prowler, its providers and boto3 for every scan. The forkserver pays
+    the import once, on the first scan of the plugin server, and every scan forks a fresh worker from it.
+    Workers are not reused, because prowler keeps its provider and its outputs in module globals.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        self._context = multiprocessing.get_context("forkserver")
+        self._context.set_forkserver_preload(_FORKSERVER_PRELOAD)
+        _LOGGER.debug(f"[ProwlerWorkerPool] forkserver preload: {_FORKSERVER_PRELOAD}")
+        self._lock = threading.Lock()
+        # Hooks of _send_findings missing in prowler, checked by the first scan that streams findings
+        self._missing_hooks = None
+
+    @classmethod
+    def get_instance(cls) -> "ProwlerWorkerPool":
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @staticmethod
+    def is_available() -> bool:
+        return "forkserver" in multiprocessing.get_all_start_methods()
+
+    def can_stream_findings(self) -> bool:
+        """Whether workers can send their findings: the prowler of the forkserver has the hooks of _send_findings.
+
+        Otherwise the findings are read from the output file, since another prowler version may have moved them.
+        """
+        with self._lock:
+            if self._missing_hooks is None:
+                self._missing_hooks = self._check_hooks()
+                if self._missing_hooks:
+                    _LOGGER.warning(
+                        f"[ProwlerWorkerPool] prowler has no {self._missing_hooks}, "
+                        f"findings are read from the output file instead of streamed"
+                    )
+            return not self._missing_hooks
+
+    def _check_hooks(self) -> List[str]:
+        reader, writer = self._context.Pipe(duplex=False)
+        process = self._context.Process(target=_send_missing_hooks, args=(writer,))
+        try:
+            process.start()
+            writer.close()
+            return reader.recv()
+        except (OSError, EOFError) as e:
+            return [f"(check failed: {e!r})"]
+        finally:
+            writer.close()
+            reader.close()
+            process.join()
+
+    def start(self, cmd: List[str], env: dict = None, stream_findings: bool = False) -> ProwlerWorker:
+        """Run cmd (a `python3 -m prowler ...` command) in a worker. env defaults to the current environment.
+
+        With stream_findings, the worker sends its findings (ProwlerWorker.read_findings) instead of writing them.
+        """
+        return ProwlerWorker(
+            self._context, cmd[len(PROWLER_COMMAND):], dict(os.environ) if env is None else env, stream_findings
+        )
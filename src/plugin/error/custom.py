@@ -3,3 +3,7 @@ from spaceone.core.error import *
 
 class ERROR_PROWLER_EXECUTION_FAILED(ERROR_BASE):
     _message = 'Prowler execution is failed. (reason={reason})'
+
+
+class ERROR_INVALID_PROWLER_OUTPUT(ERROR_BASE):
+    _message = 'Prowler output is invalid. (position={position}, reason={reason})'
@@ -6,12 +6,18 @@ from spaceone.inventory.plugin.collector.lib.server import CollectorPluginServer
 from spaceone.core.error import ERROR_INVALID_PARAMETER, ERROR_REQUIRED_PARAMETER
 from plugin.conf.global_conf import *
 from plugin.conf.collector_conf import *
-from plugin.manager.prowler_manager import ProwlerManager
 
 app = CollectorPluginServer()
 
 _LOGGER = logging.getLogger("spaceone")
 
+# prowler_manager imports prowler, so it is loaded at server start only to preload requirements.
+# Otherwise Collector.init never loads it and the first Collector.collect does.
+if PRELOAD_COMPLIANCE_FRAMEWORKS:
+    from plugin.manager.prowler_manager import ProwlerManager
+
+    ProwlerManager.preload_requirement_info(PRELOAD_COMPLIANCE_FRAMEWORKS)
+
 
 @app.route("Collector.init")
 def collector_init(params: dict) -> dict:
@@ -27,14 +33,18 @@ def collector_collect(params: dict) -> Generator[dict, None, None]:
     provider = params["options"].get("provider")
     secret_data = params["secret_data"]
     schema = params.get("schema")
+    domain_id = params.get("domain_id")
+
+    from plugin.manager.prowler_manager import ProwlerManager
 
-    _check_secret_data(provider, secret_data)
+    for account_secret_data in ProwlerManager.get_batch_secret_data(secret_data) or [secret_data]:
+        _check_secret_data(provider, account_secret_data)
 
     start_time = time.time()
     _LOGGER.debug(
         f"[collector_collect] Start Collecting Cloud Resources (provider: {provider})"
     )
-    yield from ProwlerManager().collect_resources(options, secret_data, schema)
+    yield from ProwlerManager().collect_resources(options, secret_data, schema, domain_id)
 
     _LOGGER.debug(
         f"[collector_collect] Finished Collecting Cloud Resources "
@@ -0,0 +1,159 @@
+import os
+import time
+import logging
+import threading
+from collections import deque, namedtuple
+
+from plugin.conf.global_conf import (
+    ADMISSION_CPU_BUDGET,
+    ADMISSION_MEMORY_BUDGET_MB,
+    PROWLER_PROCESS_CPU,
+    PROWLER_PROCESS_MEMORY_MB,
+)
+
+__all__ = ["AdmissionController", "Admission", "get_cpu_count", "get_memory_limit"]
+
+_LOGGER = logging.getLogger("spaceone")
+_CGROUP_MEMORY_MAX_PATH = "/sys/fs/cgroup/memory.max"
+_MEMINFO_PATH = "/proc/meminfo"
+_ADMISSION_POLL_INTERVAL = 1.0
+
+Admission = namedtuple("Admission", ["cpu", "memory_mb", "wait_time"])
+
+
+def get_cpu_count() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def get_memory_limit() -> int:
+    memory_limit = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+
+    # Container memory limit (cgroup v2)
+    if os.path.exists(_CGROUP_MEMORY_MAX_PATH):
+        with open(_CGROUP_MEMORY_MAX_PATH) as f:
+            cgroup_memory_max = f.read().strip()
+        if cgroup_memory_max.isdigit():
+            memory_limit = min(memory_limit, int(cgroup_memory_max))
+
+    return memory_limit
+
+
+def _get_available_memory_mb() -> int:
+    if os.path.exists(_MEMINFO_PATH):
+        with open(_MEMINFO_PATH) as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    return None
+
+
+class AdmissionController:
+    """Admits prowler processes of the plugin server in FIFO order within CPU and memory budgets.
+
+    A request is admitted immediately when nothing is running, so an idle node never makes a scan wait.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, cpu_budget: float, memory_budget_mb: int):
+        self.cpu_budget = cpu_budget
+        self.memory_budget_mb = memory_budget_mb
+        self._condition = threading.Condition()
+        self._queue = deque()
+        self._running_count = 0
+        self._cpu_in_use = 0
+        self._memory_in_use_mb = 0
+        self._admitted_count = 0
+        self._total_wait_time = 0.0
+        self._max_wait_time = 0.0
+
+    @classmethod
+    def get_instance(cls) -> "AdmissionController":
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls(
+                    ADMISSION_CPU_BUDGET or get_cpu_count(),
+                    ADMISSION_MEMORY_BUDGET_MB or int(get_memory_limit() // (1024 * 1024) * 0.8),
+                )
+            return cls._instance
+
+    def acquire(
+            self, cpu: float = PROWLER_PROCESS_CPU, memory_mb: int = PROWLER_PROCESS_MEMORY_MB,
+            stop_event: threading.Event = None
+    ) -> Admission:
+        """Wait for room for a prowler process. Returns None if stop_event is set before the request is admitted."""
+        # A request larger than the whole budget runs alone instead of waiting forever
+        cpu = min(cpu, self.cpu_budget)
+        memory_mb = min(memory_mb, self.memory_budget_mb)
+        ticket = object()
+        start_time = time.monotonic()
+
+        with self._condition:
+            self._queue.append(ticket)
+            try:
+                while not (self._queue[0] is ticket and self._can_admit(cpu, memory_mb)):
+                    if stop_event is not None and stop_event.is_set():
+                        self._queue.remove(ticket)
+                        self._condition.notify_all()
+                        return None
+                    self._condition.wait(timeout=_ADMISSION_POLL_INTERVAL)
+            except BaseException:
+                self._queue.remove(ticket)
+                self._condition.notify_all()
+                raise
+
+            self._queue.popleft()
+            self._running_count += 1
+            self._cpu_in_use += cpu
+            self._memory_in_use_mb += memory_mb
+
+            wait_time = time.monotonic() - start_time
+            self._admitted_count += 1
+            self._total_wait_time += wait_time
+            self._max_wait_time = max(self._max_wait_time, wait_time)
+
+            # The next request in the queue may fit as well
+            self._condition.notify_all()
+
+        if wait_time >= _ADMISSION_POLL_INTERVAL:
+            _LOGGER.debug(f"[AdmissionController] admitted after {wait_time:.2f}s (stats: {self.get_stats()})")
+
+        return Admission(cpu, memory_mb, wait_time)
+
+    def release(self, admission: Admission) -> None:
+        with self._condition:
+            self._running_count -= 1
+            self._cpu_in_use -= admission.cpu
+            self._memory_in_use_mb -= admission.memory_mb
+            self._condition.notify_all()
+
+    def get_stats(self) -> dict:
+        with self._condition:
+            return {
+                "queue_depth": len(self._queue),
+                "running": self._running_count,
+                "cpu_in_use": self._cpu_in_use,
+                "cpu_budget": self.cpu_budget,
+                "memory_in_use_mb": self._memory_in_use_mb,
+                "memory_budget_mb": self.memory_budget_mb,
+                "admitted": self._admitted_count,
+                "avg_wait_time": round(self._total_wait_time / self._admitted_count, 2) if self._admitted_count else 0,
+                "max_wait_time": round(self._max_wait_time, 2),
+            }
+
+    def _can_admit(self, cpu: float, memory_mb: int) -> bool:
+        if self._running_count == 0:
+            return True
+
+        if self._cpu_in_use + cpu > self.cpu_budget:
+            return False
+
+        if self._memory_in_use_mb + memory_mb > self.memory_budget_mb:
+            return False
+
+        # Running scans may use more memory than estimated
+        available_memory_mb = _get_available_memory_mb()
+        return available_memory_mb is None or available_memory_mb >= memory_mb
@@ -0,0 +1,124 @@
+import os
+import sys
+import json
+import fcntl
+import hashlib
+import logging
+import tempfile
+from datetime import datetime, timezone
+
+from plugin.conf.global_conf import STS_SESSION_DURATION, STS_CREDENTIALS_REFRESH_MARGIN
+
+__all__ = ["AWSCredentialBroker"]
+
+_LOGGER = logging.getLogger("spaceone")
+_ROLE_SESSION_NAME = "spaceone-prowler"
+
+
+class AWSCredentialBroker:
+    """Assumes the role of an account once and shares the session credentials with every prowler process.
+
+    Session credentials are cached in a 0600 file per source key, role and external id, and are refreshed
+    under a file lock STS_CREDENTIALS_REFRESH_MARGIN seconds before they expire. Prowler processes read them
+    through the credential_process of their profile (`python -m plugin.manager.aws_credential_broker`), so
+    shards and concurrent scans of an account share one session, and botocore refreshes it during long scans.
+    """
+
+    def __init__(self, credentials: dict, cache_dir: str = None):
+        self._credentials = credentials
+        self._cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), "prowler-sts-cache")
+        cache_key = self.make_cache_key(credentials)
+        self._cache_path = os.path.join(self._cache_dir, f"{cache_key}.json")
+        self._lock_path = os.path.join(self._cache_dir, f"{cache_key}.lock")
+
+    @staticmethod
+    def make_cache_key(credentials: dict) -> str:
+        key_data = json.dumps(
+            [
+                credentials["aws_access_key_id"],
+                credentials["aws_secret_access_key"],
+                credentials["role_arn"],
+                credentials.get("external_id"),
+            ]
+        )
+        return hashlib.sha256(key_data.encode("utf-8")).hexdigest()[:32]
+
+    def get_session_credentials(self) -> dict:
+        """Session credentials in the credential_process format (Version, AccessKeyId, ..., Expiration)"""
+        session_credentials = self._read_cache()
+        if self._is_valid(session_credentials):
+            return session_credentials
+
+        os.makedirs(self._cache_dir, mode=0o700, exist_ok=True)
+        with open(os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o600)) as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+            # Another process may have refreshed the session while this one waited for the lock
+            session_credentials = self._read_cache()
+            if not self._is_valid(session_credentials):
+                session_credentials = self._assume_role()
+                self._write_cache(session_credentials)
+
+        return session_credentials
+
+    def _assume_role(self) -> dict:
+        import boto3
+
+        _LOGGER.debug(f"[AWSCredentialBroker] assume role: {self._credentials['role_arn']}")
+        sts_client = boto3.client(
+            "sts",
+            aws_access_key_id=self._credentials["aws_access_key_id"],
+            aws_secret_access_key=self._credentials["aws_secret_access_key"],
+        )
+
+        params = {
+            "RoleArn": self._credentials["role_arn"],
+            "RoleSessionName": _ROLE_SESSION_NAME,
+            "DurationSeconds": STS_SESSION_DURATION,
+        }
+        if "external_id" in self._credentials:
+            params["ExternalId"] = self._credentials["external_id"]
+
+        credentials = sts_client.assume_role(**params)["Credentials"]
+        return {
+            "Version": 1,
+            "AccessKeyId": credentials["AccessKeyId"],
+            "SecretAccessKey": credentials["SecretAccessKey"],
+            "SessionToken": credentials["SessionToken"],
+            "Expiration": credentials["Expiration"].astimezone(timezone.utc).isoformat(),
+        }
+
+    @staticmethod
+    def _is_valid(session_credentials: dict) -> bool:
+        if not session_credentials:
+            return False
+
+        expiration = datetime.fromisoformat(session_credentials["Expiration"])
+        remaining = (expiration - datetime.now(timezone.utc)).total_seconds()
+        return remaining > STS_CREDENTIALS_REFRESH_MARGIN
+
+    def _read_cache(self) -> dict:
+        try:
+            with open(self._cache_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache(self, session_credentials: dict) -> None:
+        temp_path = f"{self._cache_path}.tmp"
+        with open(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as f:
+            json.dump(session_credentials, f)
+        os.replace(temp_path, self._cache_path)
+
+
+def main():
+    """credential_process of a scan profile: python -m plugin.manager.aws_credential_broker <role.json>"""
+    with open(sys.argv[1]) as f:
+        role = json.load(f)
+
+    broker = AWSCredentialBroker(role["credentials"], role["cache_dir"])
+    print(json.dumps(broker.get_session_credentials()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,95 +1,78 @@
-import logging
+import io
 import os
+import sys
+import json
+import shlex
+import logging
+import tempfile
 import configparser
 
 from spaceone.core import utils
+from plugin.conf.global_conf import STS_SESSION_CACHE
+from plugin.manager.aws_credential_broker import AWSCredentialBroker
 from plugin.manager.profile_manager import ProfileManager
 
 _LOGGER = logging.getLogger("spaceone")
-_AWS_PROFILE_PATH = os.environ.get(
-    "AWS_SHARED_CREDENTIALS_FILE", os.path.expanduser("~/.aws/credentials")
-)
-_AWS_PROFILE_DIR = _AWS_PROFILE_PATH.rsplit("/", 1)[0]
 
 
 class AWSProfileManager(ProfileManager):
     def _add_profile(self):
         _LOGGER.debug(f"[_AWSProfileManager] add aws profile: {self._profile_name}")
 
-        aws_profile = configparser.ConfigParser()
-
-        if os.path.exists(_AWS_PROFILE_PATH) is False:
-            self._create_profile_file(aws_profile)
-
-        aws_profile.read(_AWS_PROFILE_PATH)
+        aws_credentials = configparser.ConfigParser()
+        aws_config = configparser.ConfigParser()
 
-        if self.profile_name in aws_profile.sections():
-            self._remove_profile(aws_profile)
+        if "role_arn" in self._credentials and STS_SESSION_CACHE:
+            aws_config[f"profile {self.profile_name}"] = {
+                "credential_process": self._add_credential_process(),
+            }
 
-        aws_profile.add_section(self.profile_name)
-
-        if "role_arn" in self._credentials:
+        elif "role_arn" in self._credentials:
             self.source_profile_name = utils.random_string()
-            aws_profile.add_section(self.source_profile_name)
-            aws_profile.set(
-                self.source_profile_name,
-                "aws_access_key_id",
-                self._credentials["aws_access_key_id"],
-            )
-            aws_profile.set(
-                self.source_profile_name,
-                "aws_secret_access_key",
-                self._credentials["aws_secret_access_key"],
-            )
+            aws_credentials[self.source_profile_name] = {
+                "aws_access_key_id": self._credentials["aws_access_key_id"],
+                "aws_secret_access_key": self._credentials["aws_secret_access_key"],
+            }
 
-            aws_profile.set(
-                self.profile_name, "role_arn", self._credentials["role_arn"]
-            )
-            aws_profile.set(
-                self.profile_name, "source_profile", self.source_profile_name
-            )
+            aws_config[f"profile {self.profile_name}"] = {
+                "role_arn": self._credentials["role_arn"],
+                "source_profile": self.source_profile_name,
+            }
 
             if "external_id" in self._credentials:
-                aws_profile.set(
-                    self.profile_name, "external_id", self._credentials["external_id"]
-                )
+                aws_config[f"profile {self.profile_name}"]["external_id"] = self._credentials["external_id"]
 
         else:
-            aws_profile.set(
-                self.profile_name,
-                "aws_access_key_id",
-                self._credentials["aws_access_key_id"],
-            )
-            aws_profile.set(
-                self.profile_name,
-                "aws_secret_access_key",
-                self._credentials["aws_secret_access_key"],
-            )
-
-        with open(_AWS_PROFILE_PATH, "w") as f:
-            aws_profile.write(f)
-
-    def _create_profile_file(self, aws_profile: configparser.ConfigParser):
-        os.makedirs(_AWS_PROFILE_DIR, exist_ok=True)
-        aws_profile["default"] = {}
-        with open(_AWS_PROFILE_PATH, "w") as f:
-            aws_profile.write(f)
-
-    def _remove_profile(self, aws_profile: configparser.ConfigParser = None):
-        _LOGGER.debug(f"[_AWSProfileManager] remove aws profile: {self._profile_name}")
-
-        if aws_profile is None:
-            aws_profile = configparser.ConfigParser()
-            aws_profile.read(_AWS_PROFILE_PATH)
-
-        if self.profile_name in aws_profile.sections():
-            aws_profile.remove_section(self.profile_name)
-
-        if (
-                self.source_profile_name
-                and self.source_profile_name in aws_profile.sections()
-        ):
-            aws_profile.remove_section(self.source_profile_name)
-
-        with open(_AWS_PROFILE_PATH, "w") as f:
+            aws_credentials[self.profile_name] = {
+                "aws_access_key_id": self._credentials["aws_access_key_id"],
+                "aws_secret_access_key": self._credentials["aws_secret_access_key"],
+            }
+
+        # The private config file also keeps the shared ~/.aws/config of the node out of the scan
+        self._env = {
+            "AWS_SHARED_CREDENTIALS_FILE": self._create_profile_file("credentials", self._to_string(aws_credentials)),
+            "AWS_CONFIG_FILE": self._create_profile_file("config", self._to_string(aws_config)),
+        }
+
+    def _add_credential_process(self) -> str:
+        """Assume the role through the broker and return the credential_process that reads its cache"""
+        role = {
+            "credentials": {
+                key: self._credentials[key]
+                for key in ["aws_access_key_id", "aws_secret_access_key", "role_arn", "external_id"]
+                if key in self._credentials
+            },
+            "cache_dir": os.path.join(self._get_tmp_dir() or tempfile.gettempdir(), "prowler-sts-cache"),
+        }
+
+        # The role is assumed here once, so that an error is reported before prowler starts
+        AWSCredentialBroker(role["credentials"], role["cache_dir"]).get_session_credentials()
+
+        role_file_path = self._create_profile_file("role.json", json.dumps(role))
+        return shlex.join([sys.executable, "-m", "plugin.manager.aws_credential_broker", role_file_path])
+
+    @staticmethod
+    def _to_string(aws_profile: configparser.ConfigParser) -> str:
+        with io.StringIO() as f:
             aws_profile.write(f)
+            return f.getvalue()
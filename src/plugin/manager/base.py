@@ -1,18 +1,29 @@
 import copy
 import os
 import abc
+import queue
 import logging
-from typing import Generator
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Generator, List
 
 from spaceone.core.error import *
 from spaceone.core.manager import BaseManager
 from spaceone.core import utils
 from spaceone.inventory.plugin.collector.lib import *
-from plugin.conf.global_conf import ICON_URL_PREFIX
+from plugin.conf.global_conf import ICON_URL_PREFIX, MAX_CONCURRENT_ACCOUNT_SCANS, BATCH_RESPONSE_QUEUE_SIZE
+from plugin.connector.prowler_connector import ProwlerConnector
+from plugin.manager.collect_tracer import CollectTracer, CollectProfiler
+from plugin.manager.delta_emitter import DeltaEmitter
+from plugin.manager.scan_cache import ScanCache
 
 _LOGGER = logging.getLogger("spaceone")
 CURRENT_DIR = os.path.dirname(__file__)
 METRIC_DIR = os.path.join(CURRENT_DIR, "../metrics/")
+_ACCOUNT_SCAN_SEMAPHORE = threading.BoundedSemaphore(MAX_CONCURRENT_ACCOUNT_SCANS)
+_ACCOUNT_FINISHED = object()
+# Seconds between checks of the stop event while an account scan waits for its turn or for the consumer
+_BATCH_POLL_INTERVAL = 0.2
 
 __all__ = ["ResourceManager"]
 
@@ -26,27 +37,41 @@ class ResourceManager(BaseManager):
         self.provider = None
         self.cloud_service_group = "Prowler"
         self.cloud_service_type = None
+        self.cloud_service_types = []
         self.service_code = None
         self.is_primary = False
         self.icon = "prowler.svg"
         self.labels = ["Security", "Compliance", "CSPM"]
         self.metadata_path = "metadata/prowler.yaml"
         self.prowler_connector = None
+        self.domain_id = None
+        self.tracer = CollectTracer()
+        # Set by stop(), also from another thread: the collect was canceled
+        self.stop_event = threading.Event()
 
     def __repr__(self):
         return f"{self.__class__.__name__}"
 
-    def collect_resources(self, options: dict, secret_data: dict, schema: str) -> Generator[dict, None, None]:
+    def collect_resources(
+            self, options: dict, secret_data: dict, schema: str, domain_id: str = None
+    ) -> Generator[dict, None, None]:
+        self.tracer = CollectTracer()
+        profiler = None
+        account_count = 1
         try:
             self.provider = options.get("provider")
-            self.cloud_service_type = options["compliance_framework"]
+            self.domain_id = domain_id
+            profiler = self._start_profiler(options)
+            self.cloud_service_types = ProwlerConnector.get_compliance_frameworks(options)
+            self.cloud_service_type = self.cloud_service_types[0]
 
             if self.provider == "aws":
                 self.is_primary = True
 
-            _LOGGER.debug(f"[{self.__repr__()}] Collect cloud service type: "
-                          f"{self.cloud_service_group} > {self.cloud_service_type}")
-            yield self.get_cloud_service_type()
+            for cloud_service_type in self.cloud_service_types:
+                _LOGGER.debug(f"[{self.__repr__()}] Collect cloud service type: "
+                              f"{self.cloud_service_group} > {cloud_service_type}")
+                yield self.get_cloud_service_type(cloud_service_type)
 
             _LOGGER.debug(f"[{self.__repr__()}] Collect metrics: "
                           f"{self.cloud_service_group} > {self.cloud_service_type}")
@@ -54,30 +79,15 @@ class ResourceManager(BaseManager):
 
             _LOGGER.debug(f"[{self.__repr__()}] Collect cloud services: "
                           f"{self.cloud_service_group} > {self.cloud_service_type}")
-            response_iterator = self.collect_cloud_services(options, secret_data, schema)
-            for response in response_iterator:
-                try:
-                    yield make_response(
-                        resource_type="inventory.CloudService",
-                        cloud_service=response,
-                        match_keys=[
-                            [
-                                "reference.resource_id",
-                                "provider",
-                                "cloud_service_type",
-                                "cloud_service_group",
-                                "account",
-                            ]
-                        ],
-                    )
-                except Exception as e:
-                    _LOGGER.error(f"[{self.__repr__()}] Error: {str(e)}", exc_info=True)
-                    yield make_error_response(
-                        error=e,
-                        provider=self.provider,
-                        cloud_service_group=self.cloud_service_group,
-                        cloud_service_type=self.cloud_service_type,
-                    )
+            batch_secret_data = self.get_batch_secret_data(secret_data)
+            if batch_secret_data:
+                account_count = len(batch_secret_data)
+                yield from self.collect_batch_cloud_services(options, batch_secret_data, schema)
+            else:
+                yield from self._make_cloud_service_responses(
+                    self.collect_cloud_services(options, secret_data, schema),
+                    self._get_delta_emitter(options, secret_data),
+                )
 
         except Exception as e:
             _LOGGER.error(f"[{self.__repr__()}] Error: {str(e)}", exc_info=True)
@@ -87,14 +97,203 @@ class ResourceManager(BaseManager):
                 cloud_service_group=self.cloud_service_group,
                 cloud_service_type=self.cloud_service_type,
             )
+        finally:
+            if profiler:
+                profiler.stop()
+            self.tracer.log_summary(
+                provider=self.provider, compliance_frameworks=self.cloud_service_types, accounts=account_count
+            )
+
+    def collect_batch_cloud_services(
+            self, options: dict, batch_secret_data: List[dict], schema: str
+    ) -> Generator[dict, None, None]:
+        """Scan several accounts concurrently and stream each account's responses as they are produced.
+
+        Concurrent account scans of all collects in the process are bounded by MAX_CONCURRENT_ACCOUNT_SCANS.
+        If the collect is canceled, the account scans are stopped before it returns.
+        """
+        responses = queue.Queue(maxsize=BATCH_RESPONSE_QUEUE_SIZE)
+        max_workers = min(len(batch_secret_data), MAX_CONCURRENT_ACCOUNT_SCANS)
+        _LOGGER.debug(f"[{self.__repr__()}] Collect {len(batch_secret_data)} accounts (max_workers: {max_workers})")
+
+        resource_managers = []
+        for _ in batch_secret_data:
+            resource_manager = self.__class__()
+            resource_manager.tracer = self.tracer
+            resource_manager.stop_event = self.stop_event
+            resource_managers.append(resource_manager)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            try:
+                for resource_manager, secret_data in zip(resource_managers, batch_secret_data):
+                    executor.submit(self._collect_account, resource_manager, options, secret_data, schema, responses)
+
+                finished_count = 0
+                while finished_count < len(batch_secret_data):
+                    response = responses.get()
+                    if response is _ACCOUNT_FINISHED:
+                        finished_count += 1
+                    else:
+                        yield response
+            except BaseException:
+                # The collect was canceled or its consumer failed: the executor would otherwise wait for every scan
+                _LOGGER.warning(f"[{self.__repr__()}] batch collect stopped, stop the account scans")
+                for resource_manager in resource_managers:
+                    resource_manager.stop()
+                raise
+
+    def stop(self) -> None:
+        """Stop the collect, also from another thread. Its running prowler processes are terminated."""
+        self.stop_event.set()
+        if self.prowler_connector:
+            self.prowler_connector.stop()
+
+    def _collect_account(
+            self, resource_manager: "ResourceManager", options: dict, secret_data: dict, schema: str,
+            responses: queue.Queue
+    ) -> None:
+        response_iterator = None
+        try:
+            # Waits for the scans of the other collects without missing a stop
+            while not _ACCOUNT_SCAN_SEMAPHORE.acquire(timeout=_BATCH_POLL_INTERVAL):
+                if self.stop_event.is_set():
+                    return
+
+            try:
+                response_iterator = resource_manager._make_cloud_service_responses(
+                    resource_manager.collect_cloud_services(options, secret_data, schema),
+                    self._get_delta_emitter(options, secret_data),
+                )
+                for response in response_iterator:
+                    if not self._put_response(responses, response):
+                        break
+            finally:
+                _ACCOUNT_SCAN_SEMAPHORE.release()
+        except Exception as e:
+            _LOGGER.error(f"[{self.__repr__()}] Error: {str(e)}", exc_info=True)
+            self._put_response(
+                responses,
+                make_error_response(
+                    error=e,
+                    provider=self.provider,
+                    cloud_service_group=self.cloud_service_group,
+                    cloud_service_type=self.cloud_service_type,
+                ),
+            )
+        finally:
+            if response_iterator is not None:
+                response_iterator.close()
+            self._put_response(responses, _ACCOUNT_FINISHED)
+
+    def _put_response(self, responses: queue.Queue, response) -> bool:
+        """Wait for room in responses. Returns False if the collect is stopped, since nobody reads them any more."""
+        while not self.stop_event.is_set():
+            try:
+                responses.put(response, timeout=_BATCH_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _make_cloud_service_responses(
+            self, response_iterator: Generator[dict, None, None], delta_emitter: DeltaEmitter = None
+    ) -> Generator[dict, None, None]:
+        try:
+            for response in response_iterator:
+                with self.tracer.span("emit"):
+                    response = self._make_cloud_service_response(response, delta_emitter)
+
+                if response is not None:
+                    yield response
+        except Exception:
+            # Records emitted before the error were delivered
+            if delta_emitter:
+                delta_emitter.save()
+            raise
+
+        if delta_emitter:
+            delta_emitter.save()
+
+    def _make_cloud_service_response(self, cloud_service: dict, delta_emitter: DeltaEmitter = None) -> dict:
+        if delta_emitter:
+            cloud_service = delta_emitter.filter(cloud_service)
+            if cloud_service is None:
+                return None
+
+        try:
+            return make_response(
+                resource_type="inventory.CloudService",
+                cloud_service=cloud_service,
+                match_keys=[
+                    [
+                        "reference.resource_id",
+                        "provider",
+                        "cloud_service_type",
+                        "cloud_service_group",
+                        "account",
+                    ]
+                ],
+            )
+        except Exception as e:
+            _LOGGER.error(f"[{self.__repr__()}] Error: {str(e)}", exc_info=True)
+            return make_error_response(
+                error=e,
+                provider=self.provider,
+                cloud_service_group=self.cloud_service_group,
+                cloud_service_type=self.cloud_service_type,
+            )
+
+    def _start_profiler(self, options: dict) -> CollectProfiler:
+        """options.profile: "cprofile" | "sampling" (written to PROFILE_OUTPUT_DIR of the plugin)"""
+        profile = options.get("profile")
+        if not profile:
+            return None
+
+        profiler = CollectProfiler(profile, f"collect-{self.provider}")
+        profiler.start()
+        return profiler
+
+    def _get_delta_emitter(self, options: dict, secret_data: dict) -> DeltaEmitter:
+        """options.delta_emission: true or "keep_alive" | "suppress" """
+        delta_emission = options.get("delta_emission", False)
+        if not delta_emission:
+            return None
+
+        # Collectors of different frameworks, regions or checks on one account emit different records
+        scope_key = DeltaEmitter.make_scope_key(
+            self.domain_id,
+            self.provider,
+            ScanCache.make_scope_key(secret_data, options.get("regions")),
+            sorted(ProwlerConnector.get_compliance_frameworks(options)),
+            sorted(options.get("check_list") or []),
+        )
+        return DeltaEmitter(scope_key, "keep_alive" if delta_emission is True else delta_emission)
+
+    @staticmethod
+    def get_batch_secret_data(secret_data: dict) -> List[dict]:
+        """Expand a batch secret into per-account secrets.
+
+        secret_data.accounts: list of per-account secrets
+        secret_data.role_arns: list of role ARNs assumed with the other keys of the secret
+        """
+        if secret_data.get("accounts"):
+            return secret_data["accounts"]
+
+        if secret_data.get("role_arns"):
+            base_secret_data = {
+                key: value for key, value in secret_data.items() if key not in ["accounts", "role_arns"]
+            }
+            return [dict(base_secret_data, role_arn=role_arn) for role_arn in secret_data["role_arns"]]
+
+        return []
 
     @abc.abstractmethod
     def collect_cloud_services(self, options: dict, secret_data: dict, schema: str) -> Generator[dict, None, None]:
         raise ERROR_NOT_IMPLEMENTED()
 
-    def get_cloud_service_type(self) -> dict:
+    def get_cloud_service_type(self, name: str = None) -> dict:
         cloud_service_type = make_cloud_service_type(
-            name=self.cloud_service_type,
+            name=name or self.cloud_service_type,
             group=self.cloud_service_group,
             provider=self.provider,
             metadata_path=self.metadata_path,
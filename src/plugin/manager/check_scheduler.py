@@ -0,0 +1,103 @@
+import heapq
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import List, Tuple
+
+from plugin.conf.global_conf import PLUGIN_DATA_DIR, DEFAULT_CHECK_RUNTIME, PROWLER_STARTUP_TIME
+
+__all__ = ["CheckScheduler"]
+
+_LOGGER = logging.getLogger("spaceone")
+_CHECK_RUNTIME_HISTORY_PATH = os.path.join(os.path.expanduser(PLUGIN_DATA_DIR), "check_runtimes.json")
+_HISTORY_LOCK = threading.Lock()
+_HISTORY_SMOOTHING = 0.5
+
+
+class CheckScheduler:
+    """Packs checks into parallel prowler invocations using runtimes recorded in previous collects.
+
+    Prowler does not report how long each check takes, so the runtime of an invocation (minus the
+    prowler startup time) is attributed to its checks in proportion to their current estimates.
+    """
+
+    def __init__(self, provider: str, history_path: str = _CHECK_RUNTIME_HISTORY_PATH):
+        self.provider = provider
+        self.history_path = history_path
+        self.check_runtimes = self._load_history().get(provider, {})
+
+    def schedule(self, checks: List[str], worker_count: int) -> List[List[str]]:
+        check_groups, makespan = self.pack_longest_processing_time_first(
+            self.get_estimates(checks), worker_count
+        )
+        _LOGGER.debug(
+            f"[CheckScheduler] checks: {len(checks)}, groups: {len(check_groups)}, "
+            f"estimated makespan: {makespan + PROWLER_STARTUP_TIME:.1f}s"
+        )
+        return check_groups
+
+    def get_estimates(self, checks: List[str]) -> dict:
+        known_runtimes = list(self.check_runtimes.values())
+        default_runtime = sum(known_runtimes) / len(known_runtimes) if known_runtimes else 0
+        return {check_id: self.check_runtimes.get(check_id, default_runtime or DEFAULT_CHECK_RUNTIME) for check_id in checks}
+
+    def record(self, checks: List[str], duration: float) -> None:
+        estimates = self.get_estimates(checks)
+        estimated_total = sum(estimates.values())
+        check_duration = max(duration - PROWLER_STARTUP_TIME, 0)
+
+        for check_id, estimate in estimates.items():
+            if estimated_total:
+                observed = check_duration * estimate / estimated_total
+            else:
+                observed = check_duration / len(estimates)
+            if check_id in self.check_runtimes:
+                observed = _HISTORY_SMOOTHING * observed + (1 - _HISTORY_SMOOTHING) * self.check_runtimes[check_id]
+            self.check_runtimes[check_id] = round(observed, 3)
+
+    def save(self) -> None:
+        with _HISTORY_LOCK:
+            history = self._load_history()
+            history[self.provider] = self.check_runtimes
+
+            try:
+                history_dir = os.path.dirname(self.history_path)
+                os.makedirs(history_dir, exist_ok=True)
+                with tempfile.NamedTemporaryFile("w", dir=history_dir, delete=False) as f:
+                    json.dump(history, f)
+                os.replace(f.name, self.history_path)
+            except OSError as e:
+                _LOGGER.warning(f"[CheckScheduler] failed to save check runtime history: {e}")
+
+    @staticmethod
+    def pack_longest_processing_time_first(estimates: dict, worker_count: int) -> Tuple[List[List[str]], float]:
+        """Assign the longest remaining check to the least loaded group. Returns (groups, makespan)."""
+        worker_count = max(1, min(worker_count, len(estimates)))
+        groups = [[] for _ in range(worker_count)]
+        loads = [(0.0, i) for i in range(worker_count)]
+
+        for check_id in sorted(estimates, key=lambda x: (-estimates[x], x)):
+            load, i = heapq.heappop(loads)
+            groups[i].append(check_id)
+            heapq.heappush(loads, (load + estimates[check_id], i))
+
+        return [group for group in groups if group], max(load for load, _ in loads)
+
+    @staticmethod
+    def pack_round_robin(estimates: dict, worker_count: int) -> Tuple[List[List[str]], float]:
+        worker_count = max(1, min(worker_count, len(estimates)))
+        groups = [sorted(estimates)[i::worker_count] for i in range(worker_count)]
+        return groups, max(sum(estimates[check_id] for check_id in group) for group in groups)
+
+    def _load_history(self) -> dict:
+        if not os.path.exists(self.history_path):
+            return {}
+
+        try:
+            with open(self.history_path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            _LOGGER.warning(f"[CheckScheduler] failed to load check runtime history: {e}")
+            return {}
@@ -0,0 +1,142 @@
+import cProfile
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Generator, Iterable
+
+from spaceone.core import utils
+from spaceone.core.error import ERROR_INVALID_PARAMETER
+
+from plugin.conf.global_conf import PROFILE_OUTPUT_DIR, PROFILE_SAMPLING_INTERVAL
+
+__all__ = ["CollectTracer", "CollectProfiler"]
+
+_LOGGER = logging.getLogger("spaceone")
+_PROFILE_MODES = ["cprofile", "sampling"]
+
+
+class CollectTracer:
+    """Accumulates the time spent in each phase of a collect and logs it as one summary record.
+
+    Phases: profile_setup, profile_cleanup, admission_wait, prowler, parse, scan_cache_read, aggregate,
+    convert, emit. Spans of concurrent shards and accounts are summed, so phases can exceed the duration.
+    """
+
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.phases = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float, count: int = 1) -> None:
+        with self._lock:
+            phase = self.phases.setdefault(name, {"seconds": 0.0, "count": 0})
+            phase["seconds"] += seconds
+            phase["count"] += count
+
+    @contextmanager
+    def span(self, name: str):
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start_time)
+
+    def trace_iterator(self, name: str, iterator: Iterable) -> Generator:
+        """Time spent producing the items of an iterator (not the time the consumer holds each item)"""
+        iterator = iter(iterator)
+        seconds = 0.0
+        count = 0
+        try:
+            while True:
+                start_time = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    seconds += time.perf_counter() - start_time
+                count += 1
+                yield item
+        finally:
+            self.add(name, seconds, count)
+
+    def get_summary(self) -> dict:
+        with self._lock:
+            return {
+                "duration": round(time.perf_counter() - self.start_time, 3),
+                "phases": {
+                    name: {"seconds": round(phase["seconds"], 3), "count": phase["count"]}
+                    for name, phase in self.phases.items()
+                },
+            }
+
+    def log_summary(self, **fields) -> None:
+        _LOGGER.info(f"[CollectTracer] collect trace: {json.dumps(dict(fields, **self.get_summary()))}")
+
+
+class CollectProfiler:
+    """Profiles the plugin side of a collect (options.profile) and writes the profile to PROFILE_OUTPUT_DIR.
+
+    cprofile: cProfile of the thread that runs the collect, written as <name>.prof (pstats)
+    sampling: stacks of all threads of the plugin server (including other collects) sampled every
+              PROFILE_SAMPLING_INTERVAL, written as <name>.collapsed (folded stacks for flamegraph.pl or speedscope)
+    """
+
+    def __init__(self, mode: str, name: str, output_dir: str = PROFILE_OUTPUT_DIR):
+        if mode not in _PROFILE_MODES:
+            raise ERROR_INVALID_PARAMETER(
+                key="options.profile", reason=f"Not supported profile mode. (modes = {_PROFILE_MODES})"
+            )
+
+        self.mode = mode
+        self.output_path = os.path.join(
+            os.path.expanduser(output_dir), f"{name}-{time.strftime('%Y%m%d%H%M%S')}-{utils.random_string()}"
+        )
+        self._profile = None
+        self._samples = Counter()
+        self._sampler = None
+        self._stop_event = threading.Event()
+
+    def start(self) -> None:
+        if self.mode == "cprofile":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._sampler = threading.Thread(target=self._sample, daemon=True)
+            self._sampler.start()
+
+    def stop(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
+            if self.mode == "cprofile":
+                self._profile.disable()
+                self._profile.dump_stats(f"{self.output_path}.prof")
+                _LOGGER.info(f"[CollectProfiler] profile: {self.output_path}.prof")
+            else:
+                self._stop_event.set()
+                self._sampler.join()
+                with open(f"{self.output_path}.collapsed", "w") as f:
+                    for stack, count in self._samples.most_common():
+                        f.write(f"{stack} {count}\n")
+                _LOGGER.info(f"[CollectProfiler] profile: {self.output_path}.collapsed")
+        except OSError as e:
+            _LOGGER.warning(f"[CollectProfiler] failed to write profile: {e}")
+
+    def _sample(self) -> None:
+        sampler_id = threading.get_ident()
+        while not self._stop_event.wait(PROFILE_SAMPLING_INTERVAL):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == sampler_id:
+                    continue
+
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                self._samples[";".join(reversed(stack))] += 1
@@ -0,0 +1,146 @@
+import sys
+from typing import Tuple
+
+from plugin.conf.collector_conf import SEVERITY_SCORE_MAP
+
+__all__ = ["ComplianceKey", "ComplianceState", "CheckState", "FINDING_FIELDS", "intern_value", "merge_status"]
+
+# (cloud_service_type, account, requirement_id, requirement_seq)
+ComplianceKey = Tuple[str, str, str, int]
+
+# Findings are kept as tuples in this field order and converted to dicts at emit time
+FINDING_FIELDS = (
+    "finding_id",
+    "check_id",
+    "check_title",
+    "status",
+    "status_extended",
+    "resource",
+    "resource_type",
+    "region_code",
+)
+
+
+def intern_value(value):
+    """Intern repeated strings (check ids, titles, regions, resource types) so that every finding shares them."""
+    if type(value) is str:
+        return sys.intern(value)
+    return value
+
+
+def merge_status(status: str, other_status: str) -> str:
+    """Status of two partial aggregates of a record: FAIL, then INFO, then the initial status of the record."""
+    if status == "FAIL" or other_status == "FAIL":
+        return "FAIL"
+    if status == "INFO" or other_status == "INFO":
+        return "INFO"
+    return status
+
+
+class CheckState:
+    """Aggregation state of a check within a compliance record.
+
+    metadata: (check_title, service, check_type, severity, risk, remediation_description, remediation_links)
+    """
+
+    __slots__ = (
+        "check_id",
+        "metadata",
+        "status",
+        "score_pass",
+        "score_fail",
+        "findings_total",
+        "findings_pass",
+        "findings_fail",
+        "findings_info",
+    )
+
+    def __init__(self, check_id: str, metadata: tuple):
+        self.check_id = check_id
+        self.metadata = metadata
+        self.status = "PASS"
+        self.score_pass = 0
+        self.score_fail = 0
+        self.findings_total = 0
+        self.findings_pass = 0
+        self.findings_fail = 0
+        self.findings_info = 0
+
+    def merge(self, other: "CheckState") -> None:
+        """Add the stats of other, aggregated from the findings that follow the findings of this state."""
+        self.status = merge_status(self.status, other.status)
+        self.score_pass += other.score_pass
+        self.score_fail += other.score_fail
+        self.findings_total += other.findings_total
+        self.findings_pass += other.findings_pass
+        self.findings_fail += other.findings_fail
+        self.findings_info += other.findings_info
+
+
+class ComplianceState:
+    """Aggregation state of a compliance record (requirement of a compliance framework in an account)."""
+
+    __slots__ = (
+        "key",
+        "description",
+        "status",
+        "severity",
+        "service",
+        "region_code",
+        "score_pass",
+        "score_fail",
+        "findings_total",
+        "findings_pass",
+        "findings_fail",
+        "findings_info",
+        "checks",
+        "findings",
+    )
+
+    def __init__(
+            self, key: ComplianceKey, description: str, status: str, severity: str, service: str, region_code: str
+    ):
+        self.key = key
+        self.description = description
+        self.status = status
+        self.severity = severity
+        self.service = service
+        self.region_code = region_code
+        self.score_pass = 0
+        self.score_fail = 0
+        self.findings_total = 0
+        self.findings_pass = 0
+        self.findings_fail = 0
+        self.findings_info = 0
+        # check_id -> CheckState
+        self.checks = {}
+        # finding tuples (FINDING_FIELDS), shared with the other records of the same finding
+        self.findings = []
+
+    def merge(self, other: "ComplianceState") -> None:
+        """Add other, aggregated from the findings that follow the findings of this state.
+
+        The result is the state of aggregating both sets of findings in order: description, service and
+        check metadata of the first finding, the highest severity (the earlier one on ties), "global" when
+        the regions differ, and checks and findings in the order they appeared.
+        """
+        if SEVERITY_SCORE_MAP[self.severity] < SEVERITY_SCORE_MAP[other.severity]:
+            self.severity = other.severity
+        if self.region_code != other.region_code:
+            self.region_code = "global"
+
+        self.status = merge_status(self.status, other.status)
+        self.score_pass += other.score_pass
+        self.score_fail += other.score_fail
+        self.findings_total += other.findings_total
+        self.findings_pass += other.findings_pass
+        self.findings_fail += other.findings_fail
+        self.findings_info += other.findings_info
+
+        for check_id, check_state in other.checks.items():
+            if check_id in self.checks:
+                self.checks[check_id].merge(check_state)
+            else:
+                self.checks[check_id] = check_state
+
+        self.findings.extend(other.findings)
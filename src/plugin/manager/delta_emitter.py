@@ -0,0 +1,131 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+
+from spaceone.core.error import ERROR_INVALID_PARAMETER
+
+from plugin.conf.global_conf import PLUGIN_DATA_DIR, DELTA_FULL_RESEND_INTERVAL, DELTA_MAX_SUPPRESSED_COLLECTS
+
+__all__ = ["DeltaEmitter"]
+
+_LOGGER = logging.getLogger("spaceone")
+_DELTA_STATE_DIR = os.path.join(os.path.expanduser(PLUGIN_DATA_DIR), "delta_state")
+_DELTA_MODES = ["keep_alive", "suppress"]
+
+# Fields of a keep-alive record, enough for the inventory to match the record and mark it as collected
+_KEEP_ALIVE_FIELDS = [
+    "name",
+    "reference",
+    "account",
+    "provider",
+    "cloud_service_group",
+    "cloud_service_type",
+    "region_code",
+]
+
+
+class DeltaEmitter:
+    """Replaces cloud service records that are unchanged since the previous collect.
+
+    A content hash, the time of the last full emission and the number of collects that suppressed the
+    record since then are kept per reference.resource_id. An unchanged record is replaced by a keep-alive
+    record without data (mode: keep_alive), so that garbage_collection does not delete it, or is not
+    emitted at all (mode: suppress). A suppressed record is fully emitted again after
+    DELTA_MAX_SUPPRESSED_COLLECTS collects, before garbage_collection deletes it, and every record is fully
+    emitted again after DELTA_FULL_RESEND_INTERVAL.
+    """
+
+    def __init__(self, scope_key: str, mode: str = "keep_alive", state_dir: str = _DELTA_STATE_DIR):
+        if mode not in _DELTA_MODES:
+            raise ERROR_INVALID_PARAMETER(
+                key="options.delta_emission", reason=f"Not supported delta emission mode. (modes = {_DELTA_MODES})"
+            )
+
+        self.mode = mode
+        self.state_path = os.path.join(state_dir, f"{scope_key}.json")
+        self.state = self._load_state()
+        self.new_state = {}
+        self.stats = {"full": 0, "keep_alive": 0, "suppressed": 0}
+
+    @staticmethod
+    def make_scope_key(*args) -> str:
+        return hashlib.sha256(json.dumps(args, sort_keys=True).encode("utf-8")).hexdigest()[:32]
+
+    def filter(self, cloud_service: dict) -> dict:
+        """Return the record to emit: cloud_service itself, a keep-alive record or None."""
+        resource_id = cloud_service["reference"]["resource_id"]
+        content_hash = self.make_content_hash(cloud_service)
+        now = time.time()
+
+        old_hash, emitted_at, suppressed_count = self._get_state(resource_id)
+        if (
+            old_hash != content_hash
+            or now - emitted_at >= DELTA_FULL_RESEND_INTERVAL
+            or (self.mode == "suppress" and suppressed_count >= DELTA_MAX_SUPPRESSED_COLLECTS)
+        ):
+            self.new_state[resource_id] = (content_hash, now, 0)
+            self.stats["full"] += 1
+            return cloud_service
+
+        if self.mode == "suppress":
+            self.new_state[resource_id] = (content_hash, emitted_at, suppressed_count + 1)
+            self.stats["suppressed"] += 1
+            return None
+
+        self.new_state[resource_id] = (content_hash, emitted_at, 0)
+        self.stats["keep_alive"] += 1
+        return {key: cloud_service[key] for key in _KEEP_ALIVE_FIELDS if key in cloud_service}
+
+    @staticmethod
+    def make_content_hash(cloud_service: dict) -> str:
+        # Findings and checks are ordered by prowler's (or the shards') completion order, which is not a change
+        data = cloud_service.get("data") or {}
+        if isinstance(data.get("findings"), list) and isinstance(data.get("checks"), list):
+            data = dict(
+                data,
+                findings=sorted(data["findings"], key=lambda finding: finding.get("finding_id") or ""),
+                checks=sorted(data["checks"], key=lambda check: check.get("check_id") or ""),
+            )
+            cloud_service = dict(cloud_service, data=data)
+
+        return hashlib.blake2b(
+            json.dumps(cloud_service, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8"),
+            digest_size=16,
+        ).hexdigest()
+
+    def save(self) -> None:
+        """Keep the hashes of the records of this collect only. A record that disappears is fully emitted when it is back."""
+        _LOGGER.debug(f"[DeltaEmitter] emitted records: {self.stats}")
+
+        try:
+            state_dir = os.path.dirname(self.state_path)
+            os.makedirs(state_dir, exist_ok=True)
+            with tempfile.NamedTemporaryFile("w", dir=state_dir, delete=False) as f:
+                json.dump(self.new_state, f)
+            os.replace(f.name, self.state_path)
+        except OSError as e:
+            _LOGGER.warning(f"[DeltaEmitter] failed to save delta state: {e}")
+
+    def _get_state(self, resource_id: str) -> tuple:
+        """(content hash, time of the last full emission, consecutive suppressed collects) of a record"""
+        state = self.state.get(resource_id)
+        if not state:
+            return None, 0, 0
+
+        # States saved before suppressed collects were counted have no count
+        old_hash, emitted_at, *suppressed_count = state
+        return old_hash, emitted_at, suppressed_count[0] if suppressed_count else DELTA_MAX_SUPPRESSED_COLLECTS
+
+    def _load_state(self) -> dict:
+        if not os.path.exists(self.state_path):
+            return {}
+
+        try:
+            with open(self.state_path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            _LOGGER.warning(f"[DeltaEmitter] failed to load delta state: {e}")
+            return {}
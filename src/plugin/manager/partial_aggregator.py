@@ -0,0 +1,82 @@
+import time
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Generator, List
+
+__all__ = ["PartialAggregator"]
+
+_LOGGER = logging.getLogger("spaceone")
+
+# ProwlerManager of a worker process, made once by the initializer of the worker
+_WORKER_MANAGER = None
+
+
+def _init_worker(provider: str, cloud_service_types: List[str], requirement_info: dict) -> None:
+    global _WORKER_MANAGER
+    from plugin.manager.prowler_manager import ProwlerManager
+
+    _WORKER_MANAGER = ProwlerManager()
+    _WORKER_MANAGER.provider = provider
+    _WORKER_MANAGER.cloud_service_types = cloud_service_types
+    _WORKER_MANAGER.cloud_service_type = cloud_service_types[0]
+    # The requirement info of the collect, so that a worker does not load the compliance frameworks again
+    _WORKER_MANAGER.requirement_info = requirement_info
+
+
+def _aggregate_file(file_path: str, is_complete: bool = True) -> tuple:
+    """Parse an OCSF output file and aggregate its findings into a partial compliance_results."""
+    from plugin.connector.ocsf_reader import read_findings
+
+    _WORKER_MANAGER.compliance_results = {}
+    _WORKER_MANAGER.checks_metadata = {}
+    start_time = time.perf_counter()
+    count = 0
+    with open(file_path, "rb") as file:
+        for check_result in read_findings(file, is_complete):
+            _WORKER_MANAGER.make_compliance_results(check_result)
+            count += 1
+
+    return _WORKER_MANAGER.compliance_results, count, time.perf_counter() - start_time
+
+
+class PartialAggregator:
+    """Parses and aggregates the OCSF output files of a sharded scan in worker processes (options.aggregation_workers).
+
+    Each output file is aggregated into a partial compliance_results of its own, and the partial
+    results are merged in the order the files were submitted, so the result equals aggregating the
+    findings of the files one after another in the collect's process.
+    """
+
+    def __init__(self, provider: str, cloud_service_types: List[str], requirement_info: dict, max_workers: int):
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            # Workers fork from the server that has already imported prowler (ProwlerWorkerPool)
+            context = multiprocessing.get_context("forkserver")
+        else:
+            context = multiprocessing.get_context("spawn")
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(provider, cloud_service_types, requirement_info),
+        )
+        self._futures = []
+
+    def submit(self, file_path: str, is_complete: bool = True) -> None:
+        """Aggregate an output file. is_complete is False if prowler did not exit 0 (see read_findings)."""
+        self._futures.append(self._executor.submit(_aggregate_file, file_path, is_complete))
+
+    def wait(self) -> None:
+        """Wait until the submitted files are parsed, before they are removed."""
+        for future in self._futures:
+            future.exception()
+
+    def get_results(self) -> Generator[tuple, None, None]:
+        """(partial compliance_results, finding count, seconds) of the submitted files in submission order"""
+        for future in self._futures:
+            yield future.result()
+        self._futures = []
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(cancel_futures=True)
@@ -1,17 +1,31 @@
 import logging
 import abc
+import os
+import shutil
+import tempfile
 
 from spaceone.core import utils
+from plugin.conf.global_conf import CREDENTIALS_TMP_DIR
+from plugin.manager.collect_tracer import CollectTracer
 
 _LOGGER = logging.getLogger("spaceone")
 
 
 class ProfileManager:
-    def __init__(self, credentials: dict):
+    """Writes the credentials of one scan into a private directory that only this scan uses.
+
+    The directory is created on tmpfs (CREDENTIALS_TMP_DIR) with mode 0700 and removed with its files
+    when the scan ends, so concurrent scans never share or rewrite a credential file.
+    """
+
+    def __init__(self, credentials: dict, tracer: CollectTracer = None):
         self._profile_name = utils.random_string()
         self._source_profile_name = None
         self._source_profile_path = None
+        self._profile_dir = None
+        self._env = {}
         self._credentials = credentials
+        self._tracer = tracer or CollectTracer()
 
     @property
     def profile_name(self) -> str:
@@ -37,21 +51,43 @@ class ProfileManager:
     def credentials(self) -> dict:
         return self._credentials
 
+    @property
+    def env(self) -> dict:
+        """Environment variables that point the prowler process to the credential files of this scan"""
+        return self._env
+
     def __enter__(self) -> "ProfileManager":
-        self._add_profile()
+        with self._tracer.span("profile_setup"):
+            self._profile_dir = tempfile.mkdtemp(prefix="prowler-", dir=self._get_tmp_dir())
+            try:
+                self._add_profile()
+            except Exception:
+                self._remove_profile()
+                raise
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self._remove_profile()
+        with self._tracer.span("profile_cleanup"):
+            self._remove_profile()
 
     @abc.abstractmethod
     def _add_profile(self):
         raise NotImplemented("Please implement _add_profile method")
 
-    @abc.abstractmethod
-    def _create_profile_file(self, profile):
-        raise NotImplemented("Please implement _create_profile_file method")
+    def _create_profile_file(self, file_name: str, content: str) -> str:
+        file_path = os.path.join(self._profile_dir, file_name)
+        with open(os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), "w") as f:
+            f.write(content)
+        return file_path
 
-    @abc.abstractmethod
-    def _remove_profile(self, profile=None):
-        raise NotImplemented("Please implement _remove_profile method")
+    def _remove_profile(self):
+        _LOGGER.debug(f"[{self.__class__.__name__}] remove profile: {self._profile_name}")
+        if self._profile_dir:
+            shutil.rmtree(self._profile_dir, ignore_errors=True)
+            self._profile_dir = None
+
+    @staticmethod
+    def _get_tmp_dir() -> str:
+        if os.path.isdir(CREDENTIALS_TMP_DIR) and os.access(CREDENTIALS_TMP_DIR, os.W_OK | os.X_OK):
+            return CREDENTIALS_TMP_DIR
+        return None
@@ -1,7 +1,8 @@
-import time
-import random
 import logging
-from typing import Generator
+import threading
+import time
+from collections import OrderedDict
+from typing import Generator, Iterable, Tuple
 
 from natsort import natsorted
 from prowler.lib.check.compliance_models import Compliance
@@ -9,10 +10,19 @@ from prowler.lib.check.compliance_models import Compliance
 from plugin.error.custom import *
 from plugin.manager.base import ResourceManager
 from plugin.connector.prowler_connector import ProwlerConnector
+from plugin.manager.admission_controller import AdmissionController
+from plugin.manager.compliance_state import *
+from plugin.manager.scan_cache import ScanCache
+from plugin.manager.partial_aggregator import PartialAggregator
 from plugin.conf.collector_conf import *
+from plugin.conf.global_conf import REQUIREMENT_INFO_CACHE_SIZE, AGGREGATION_WORKERS
 
 _LOGGER = logging.getLogger("spaceone")
 
+# (provider, compliance_framework) -> requirement info, shared by all collects in the process
+_REQUIREMENT_INFO_CACHE = OrderedDict()
+_REQUIREMENT_INFO_CACHE_LOCK = threading.Lock()
+
 
 class ProwlerManager(ResourceManager):
     provider = None
@@ -23,6 +33,7 @@ class ProwlerManager(ResourceManager):
         self.provider = None
         self.cloud_service_group = "Prowler"
         self.cloud_service_type = None
+        self.cloud_service_types = []
         self.service_code = None
         self.is_primary = True
         self.icon = "prowler.svg"
@@ -32,178 +43,320 @@ class ProwlerManager(ResourceManager):
         self.requirement_info = {}
         self.checklist = []
         self.is_custom_checks = False
+        # Check metadata tuples shared by CheckStates
         self.checks_metadata = {}
+        # ComplianceKey -> ComplianceState
         self.compliance_results = {}
+        # check_id -> regions of the check that timed out (None: all regions)
+        self.timed_out_checks = {}
 
     def collect_cloud_services(
             self, options: dict, secret_data: dict, schema: str
     ) -> Generator[dict, None, None]:
         try:
             self.provider = options.get("provider")
-            self.cloud_service_type = options["compliance_framework"]
+            self.cloud_service_types = ProwlerConnector.get_compliance_frameworks(options)
+            self.cloud_service_type = self.cloud_service_types[0]
 
             if self.provider == "aws":
                 self.is_primary = True
 
             self.checklist = options.get("check_list")
             self.prowler_connector = ProwlerConnector()
+            self.prowler_connector.tracer = self.tracer
+            self.prowler_connector.stop_event = self.stop_event
             self._check_compliance_framework()
 
-            if not self.requirement_info:
-                self._load_requirement_info()
+            self._load_requirement_info()
 
-            self._wait_random_time()
             self.compliance_results.clear()
+            self.checks_metadata.clear()
+            self.timed_out_checks = {}
 
-            err_message = None
-            for check_results, err_message in self.prowler_connector.check(
-                    options, secret_data
-            ):
-                if check_results:
-                    self.make_compliance_results(check_results)
+            compliance_checks = self._get_compliance_checks()
+            if options.get("scan_cache", False):
+                scan_cache = ScanCache(
+                    self.provider, secret_data, options.get("regions"), options.get("scan_cache_ttl")
+                )
+                err_message = self._scan_with_cache(options, secret_data, compliance_checks, scan_cache)
+            else:
+                err_message = self._scan(options, secret_data, compliance_checks)
+                self._load_timed_out_checks(compliance_checks)
+
+            # Without any finding, the account of the partial compliance results is unknown
+            if self.timed_out_checks and not self.compliance_results and not err_message:
+                err_message = f"Scan timed out before any finding was written. (checks = {len(self.timed_out_checks)})"
+
+            _LOGGER.debug(
+                f"[{self.__repr__()}.collect_cloud_services] admission stats: "
+                f"{AdmissionController.get_instance().get_stats()}"
+            )
 
             # Return compliance results (Cloud Services)
-            for compliance_result in self._convert_results(self.compliance_results):
-                yield compliance_result
+            yield from self.tracer.trace_iterator("convert", self._convert_results(self.compliance_results))
 
             if err_message:
                 _LOGGER.error(f"[{self.__repr__()}.collect_cloud_services] Error: {err_message}")
                 raise Exception(err_message)
         finally:
             self.compliance_results.clear()
+            self.checks_metadata.clear()
 
 
-    def make_compliance_results(self, check_result: dict):
-        check_id = check_result["metadata"]["event_code"]
-        account = check_result["cloud"]["account"]["uid"]
-        requirement_ids = check_result["unmapped"].get("compliance", {}).get(
-            self.cloud_service_type, []
+    def _scan(self, options: dict, secret_data: dict, compliance_checks: list) -> str:
+        """Scan and aggregate the findings. options.aggregation_workers: aggregate shards in worker processes"""
+        aggregation_workers = options.get("aggregation_workers", AGGREGATION_WORKERS)
+        if not aggregation_workers:
+            return self._aggregate_findings(self.prowler_connector.check(options, secret_data, compliance_checks))
+
+        partial_aggregator = PartialAggregator(
+            self.provider, self.cloud_service_types, self.requirement_info, aggregation_workers
         )
-        for requirement_id in requirement_ids:
-            requirement_seq = next(
-                (requirement['Requirement_Seq']
-                 for requirement in self.requirement_info[self.cloud_service_type]['Requirements']
-                 if requirement['Id'] == requirement_id and check_id in requirement['Checks']
-                 ),
-                None
+        self.prowler_connector.partial_aggregator = partial_aggregator
+        try:
+            err_message = self._aggregate_findings(
+                self.prowler_connector.check(options, secret_data, compliance_checks)
             )
 
-            compliance_id = (
-                f"prowler:{self.provider}:{account}:{self.cloud_service_type}:{requirement_id}:"
-                f"{str(requirement_seq)}"
-            ).lower()
-            status = check_result["status_code"]
-            region_code = check_result["cloud"]["region"]
-            severity = SEVERITY_MAP.get(check_result["severity"], "UNKNOWN")
-            score = SEVERITY_SCORE_MAP[severity]
-
-            if compliance_id not in self.compliance_results:
-                self.compliance_results[
-                    compliance_id
-                ] = self._make_base_compliance_result(
-                    compliance_id, requirement_id, requirement_seq, check_id, severity, check_result
-                )
+            merge_time = 0.0
+            for compliance_results, count, aggregate_time in partial_aggregator.get_results():
+                self.tracer.add("partial_aggregate", aggregate_time, count)
+                start_time = time.perf_counter()
+                self.merge_compliance_results(compliance_results)
+                merge_time += time.perf_counter() - start_time
+            self.tracer.add("merge", merge_time)
+        finally:
+            partial_aggregator.shutdown()
 
-            check_exists = (
-                    check_id in self.compliance_results[compliance_id]["data"]["checks"]
-            )
+        return err_message
 
-            if self.compliance_results[compliance_id]["region_code"] != region_code:
-                self.compliance_results[compliance_id]["region_code"] = "global"
+    def _scan_with_cache(
+            self, options: dict, secret_data: dict, compliance_checks: list, scan_cache: ScanCache
+    ) -> str:
+        """Aggregate the cached findings of unexpired checks and scan only the expired checks."""
+        checks = self.checklist or compliance_checks
+        expired_checks = scan_cache.get_expired_checks(checks)
+        expired_check_set = set(expired_checks)
 
-            self.compliance_results[compliance_id]["data"][
-                "severity"
-            ] = self._update_severity(
-                self.compliance_results[compliance_id]["data"]["severity"], severity
-            )
+        cached_findings = self.tracer.trace_iterator(
+            "scan_cache_read",
+            scan_cache.read_findings([check_id for check_id in checks if check_id not in expired_check_set]),
+        )
+        self._aggregate_findings((check_results, None) for check_results in cached_findings)
+
+        if not expired_checks:
+            return None
 
-            self.compliance_results[compliance_id][
-                "data"
-            ] = self._update_compliance_status_and_stats(
-                self.compliance_results[compliance_id]["data"], status, score
+        scan_cache.start_scan()
+        try:
+            err_message = self._aggregate_findings(
+                self.prowler_connector.check(dict(options, check_list=expired_checks), secret_data, expired_checks),
+                scan_cache,
             )
+            self._load_timed_out_checks(expired_checks)
 
-            self.compliance_results[compliance_id]["data"]["findings"].append(
-                self._make_finding(check_result)
+            # Findings of a failed scan or of a timed out check may be incomplete
+            if not err_message:
+                scan_cache.commit_scan(
+                    [check_id for check_id in expired_checks if check_id not in self.timed_out_checks]
+                )
+        finally:
+            scan_cache.discard_scan()
+
+        return err_message
+
+    def _aggregate_findings(self, findings: Iterable[Tuple[dict, str]], scan_cache: ScanCache = None) -> str:
+        """Aggregate (check_results, err_message) pairs and return the last err_message."""
+        err_message = None
+        aggregate_time = 0.0
+        count = 0
+        try:
+            for check_results, err_message in findings:
+                if check_results:
+                    start_time = time.perf_counter()
+                    self.make_compliance_results(check_results)
+                    aggregate_time += time.perf_counter() - start_time
+                    count += 1
+
+                    if scan_cache:
+                        scan_cache.write_finding(check_results)
+        finally:
+            self.tracer.add("aggregate", aggregate_time, count)
+
+        return err_message
+
+    def _load_timed_out_checks(self, checks: list) -> None:
+        """Collect the checks and regions of the prowler processes that did not finish before their deadline."""
+        for timed_out in self.prowler_connector.timed_out:
+            for check_id in timed_out["checks"] or checks:
+                if not timed_out["regions"]:
+                    self.timed_out_checks[check_id] = None
+                elif check_id not in self.timed_out_checks:
+                    self.timed_out_checks[check_id] = set(timed_out["regions"])
+                elif self.timed_out_checks[check_id] is not None:
+                    self.timed_out_checks[check_id].update(timed_out["regions"])
+
+        if self.timed_out_checks:
+            _LOGGER.warning(
+                f"[{self.__repr__()}._load_timed_out_checks] scan timed out, "
+                f"compliance results of {len(self.timed_out_checks)} checks are partial"
             )
 
-            if not check_exists:
-                self.compliance_results[compliance_id]["data"]["checks"][
-                    check_id
-                ] = self._make_check(check_result)
-
-            self.compliance_results[compliance_id]["data"]["checks"][
-                check_id
-            ] = self._update_check_status_and_stats(
-                self.compliance_results[compliance_id]["data"]["checks"][check_id],
-                status,
-                score,
+    def merge_compliance_results(self, compliance_results: dict) -> None:
+        """Merge partial compliance_results aggregated from the findings that follow the aggregated findings."""
+        for compliance_key, compliance_state in compliance_results.items():
+            for check_state in compliance_state.checks.values():
+                check_state.metadata = self.checks_metadata.setdefault(check_state.metadata, check_state.metadata)
+
+            current_state = self.compliance_results.get(compliance_key)
+            if current_state is None:
+                self.compliance_results[compliance_key] = compliance_state
+            else:
+                current_state.merge(compliance_state)
+
+    def make_compliance_results(self, check_result: dict):
+        check_id = intern_value(check_result["metadata"]["event_code"])
+        account = intern_value(check_result["cloud"]["account"]["uid"])
+        compliance = check_result["unmapped"].get("compliance", {})
+        status = intern_value(check_result["status_code"])
+        region_code = intern_value(check_result["cloud"]["region"])
+        severity = SEVERITY_MAP.get(check_result["severity"], "UNKNOWN")
+        score = SEVERITY_SCORE_MAP[severity]
+
+        # The finding tuple is shared by all compliance records the finding belongs to
+        finding = None
+
+        # A finding is routed to every requested compliance framework that maps its check
+        for cloud_service_type in self.cloud_service_types:
+            requirement_ids = compliance.get(cloud_service_type, [])
+            requirement_seqs = self.requirement_info[cloud_service_type]['Requirement_Seqs']
+            for requirement_id in requirement_ids:
+                requirement_seq = requirement_seqs.get((requirement_id, check_id))
+                compliance_key = (cloud_service_type, account, requirement_id, requirement_seq)
+
+                compliance_state = self.compliance_results.get(compliance_key)
+                if compliance_state is None:
+                    compliance_state = self.compliance_results[compliance_key] = self._make_compliance_state(
+                        compliance_key, severity, check_result
+                    )
+
+                if compliance_state.region_code != region_code:
+                    compliance_state.region_code = "global"
+
+                compliance_state.severity = self._update_severity(compliance_state.severity, severity)
+                self._update_compliance_status_and_stats(compliance_state, status, score)
+
+                if finding is None:
+                    finding = self._make_finding(check_result)
+                compliance_state.findings.append(finding)
+
+                check_state = compliance_state.checks.get(check_id)
+                if check_state is None:
+                    check_state = compliance_state.checks[check_id] = self._make_check_state(check_id, check_result)
+
+                self._update_check_status_and_stats(check_state, status, score)
+
+    def _convert_results(self, compliance_results: dict) -> Generator[dict, None, None]:
+        # Records are removed from compliance_results as they are emitted, so their findings can be freed
+        # as soon as the consumer is done with them.
+        requirement_seqs = {}
+        for compliance_key in list(compliance_results.keys()):
+            compliance_state = compliance_results.pop(compliance_key)
+            cloud_service_type, account, requirement_id, requirement_seq = compliance_key
+
+            if (cloud_service_type, account) not in requirement_seqs:
+                requirement_seqs[(cloud_service_type, account)] = set()
+            requirement_seqs[(cloud_service_type, account)].add(requirement_seq)
+
+            compliance_result = self._finalize_compliance_result(
+                self._make_base_compliance_result(
+                    account, requirement_id, requirement_seq, cloud_service_type, compliance_state
+                )
             )
 
-    def _convert_results(self, compliance_results):
-        results = []
-        for compliance_result in compliance_results.values():
-            total_check_count = 0
-            pass_check_count = 0
-            fail_check_count = 0
-            info_check_count = 0
-
-            compliance_result["data"]["stats"]["score"][
-                "percent"
-            ] = self._calculate_score(compliance_result["data"]["stats"])
-
-            changed_checks = []
-            for check in compliance_result["data"]["checks"].values():
-                total_check_count += 1
-                if check["status"] == "FAIL":
-                    fail_check_count += 1
-                elif check["status"] == "INFO" or check["status"] == "MANUAL":
-                    info_check_count += 1
+            if self.timed_out_checks:
+                if requirement_seq is None:
+                    requirement_checks = compliance_state.checks.keys()
                 else:
-                    pass_check_count += 1
+                    requirement_checks = self._get_requirement_checks(cloud_service_type, requirement_seq)
+                self._mark_partial(compliance_result, requirement_checks)
 
-                check["display"] = self._make_check_display(check["stats"])
-                check["stats"]["score"]["percent"] = self._calculate_score(
-                    check["stats"]
-                )
-                changed_checks.append(check)
-
-            compliance_result["data"]["checks"] = changed_checks
-            compliance_result["data"]["stats"]["checks"] = {
-                "total": total_check_count,
-                "pass": pass_check_count,
-                "fail": fail_check_count,
-                "info": info_check_count,
-            }
+            yield compliance_result
+
+        # Requirements without any finding
+        for (cloud_service_type, account), present_seqs in requirement_seqs.items():
+            for requirement in self.requirement_info[cloud_service_type]['Requirements']:
+                if requirement['Requirement_Seq'] not in present_seqs:
+                    compliance_result = self._make_base_compliance_result(
+                        account, requirement['Id'], requirement['Requirement_Seq'], cloud_service_type
+                    )
+                    if self.timed_out_checks:
+                        self._mark_partial(compliance_result, requirement['Checks'])
+
+                    yield compliance_result
+
+    def _get_requirement_checks(self, cloud_service_type: str, requirement_seq: int) -> list:
+        # Requirement_Seq is the 1-based position of the requirement
+        return self.requirement_info[cloud_service_type]['Requirements'][requirement_seq - 1]['Checks']
+
+    def _mark_partial(self, compliance_result: dict, requirement_checks: Iterable[str]) -> None:
+        """Mark a compliance record whose checks timed out. timed_out.regions is empty when all regions timed out."""
+        timed_out_checks = [check_id for check_id in requirement_checks if check_id in self.timed_out_checks]
+        if not timed_out_checks:
+            return
+
+        timed_out_regions = set()
+        for check_id in timed_out_checks:
+            if self.timed_out_checks[check_id] is None:
+                timed_out_regions = None
+                break
+            timed_out_regions.update(self.timed_out_checks[check_id])
+
+        compliance_result["data"]["partial"] = True
+        compliance_result["data"]["timed_out"] = {
+            "checks": sorted(timed_out_checks),
+            "regions": sorted(timed_out_regions) if timed_out_regions is not None else [],
+        }
 
-            compliance_result["data"]["display"] = self._make_compliance_display(
-                compliance_result["data"]["stats"]
+    def _finalize_compliance_result(self, compliance_result: dict) -> dict:
+        total_check_count = 0
+        pass_check_count = 0
+        fail_check_count = 0
+        info_check_count = 0
+
+        compliance_result["data"]["stats"]["score"][
+            "percent"
+        ] = self._calculate_score(compliance_result["data"]["stats"])
+
+        changed_checks = []
+        for check in compliance_result["data"]["checks"].values():
+            total_check_count += 1
+            if check["status"] == "FAIL":
+                fail_check_count += 1
+            elif check["status"] == "INFO" or check["status"] == "MANUAL":
+                info_check_count += 1
+            else:
+                pass_check_count += 1
+
+            check["display"] = self._make_check_display(check["stats"])
+            check["stats"]["score"]["percent"] = self._calculate_score(
+                check["stats"]
             )
+            changed_checks.append(check)
+
+        compliance_result["data"]["checks"] = changed_checks
+        compliance_result["data"]["stats"]["checks"] = {
+            "total": total_check_count,
+            "pass": pass_check_count,
+            "fail": fail_check_count,
+            "info": info_check_count,
+        }
 
-            results.append(compliance_result)
-
-        compliance_ids = {}
-        for key in compliance_results.keys():
-            _, _, account, _, _, requirement_seq = key.split(":")
-            if account not in compliance_ids:
-                compliance_ids[account] = []
-            compliance_ids[account].append(requirement_seq)
-
-        for account in compliance_ids.keys():
-            for requirement in self.requirement_info[self.cloud_service_type]['Requirements']:
-                if str(requirement['Requirement_Seq']) not in compliance_ids.get(account, []):
-                    compliance_id = (
-                        f"prowler:{self.provider}:{account}:{self.cloud_service_type}:{requirement['Id']}:"
-                        f"{str(requirement['Requirement_Seq'])}"
-                    ).lower()
-                    compliance_results[
-                        compliance_id
-                    ] = self._make_base_compliance_result(
-                        compliance_id, requirement['Id'], requirement['Requirement_Seq'], None, None, None
-                    )
-                    results.append(compliance_results[compliance_id])
+        compliance_result["data"]["display"] = self._make_compliance_display(
+            compliance_result["data"]["stats"]
+        )
 
-        return results
+        return compliance_result
 
     @staticmethod
     def _make_check_display(check_stats):
@@ -241,24 +394,48 @@ class ProwlerManager(ResourceManager):
             return new_severity
         return old_severity
 
-    def _make_check(self, check_result: dict) -> dict:
+    def _make_check_state(self, check_id: str, check_result: dict) -> CheckState:
+        remediation_info = check_result["remediation"]
+        metadata = (
+            intern_value(check_result["finding_info"]["title"]),
+            intern_value(check_result["resources"][0]["group"]["name"]),
+            check_result["unmapped"]["check_type"],
+            SEVERITY_MAP.get(check_result["severity"], "UNKNOWN"),
+            check_result["risk_details"],
+            remediation_info.get("desc", ""),
+            tuple(remediation_info["references"]),
+        )
+
+        # Checks of different compliance records share the same metadata tuple
+        metadata = self.checks_metadata.setdefault(metadata, metadata)
+        return CheckState(check_id, metadata)
+
+    @staticmethod
+    def _make_check(check_state: CheckState) -> dict:
+        (
+            check_title, service, check_type, severity, risk, remediation_description, remediation_links
+        ) = check_state.metadata
+
         check = {
-            "check_id": check_result["metadata"]["event_code"],
-            "check_title": check_result["finding_info"]["title"],
-            "service": check_result["resources"][0]["group"]["name"],
+            "check_id": check_state.check_id,
+            "check_title": check_title,
+            "service": service,
             "sub_service": "",
-            "check_type": check_result["unmapped"]["check_type"],
-            "status": "PASS",
-            "severity": SEVERITY_MAP.get(check_result["severity"], "UNKNOWN"),
-            "risk": check_result["risk_details"],
-            "remediation": self._make_remediation(check_result["remediation"]),
+            "check_type": check_type,
+            "status": check_state.status,
+            "severity": severity,
+            "risk": risk,
+            "remediation": {
+                "description": remediation_description,
+                "link": list(remediation_links),
+            },
             "stats": {
-                "score": {"pass": 0, "fail": 0, "percent": 0},
+                "score": {"pass": check_state.score_pass, "fail": check_state.score_fail, "percent": 0},
                 "findings": {
-                    "total": 0,
-                    "pass": 0,
-                    "fail": 0,
-                    "info": 0,
+                    "total": check_state.findings_total,
+                    "pass": check_state.findings_pass,
+                    "fail": check_state.findings_fail,
+                    "info": check_state.findings_info,
                 },
             },
         }
@@ -266,85 +443,85 @@ class ProwlerManager(ResourceManager):
         return check
 
     @staticmethod
-    def _make_remediation(remediation_info):
-        return {
-            "description": remediation_info.get("desc", ""),
-            "link": remediation_info["references"],
-        }
-
-    @staticmethod
-    def _make_finding(check_result: dict) -> dict:
-        return {
-            "finding_id": check_result["finding_info"]["uid"],
-            "check_id": check_result["metadata"]["event_code"],
-            "check_title": check_result["finding_info"]["title"],
-            "status": check_result["status_code"],
-            "status_extended": check_result["status_detail"],
-            "resource": check_result["resources"][0]["name"] or check_result["resources"][0]["uid"],
-            "resource_type": check_result["resources"][0]["type"],
-            "region_code": check_result["cloud"]["region"],
-        }
+    def _make_finding(check_result: dict) -> tuple:
+        # Field order of FINDING_FIELDS
+        return (
+            check_result["finding_info"]["uid"],
+            intern_value(check_result["metadata"]["event_code"]),
+            intern_value(check_result["finding_info"]["title"]),
+            intern_value(check_result["status_code"]),
+            check_result["status_detail"],
+            check_result["resources"][0]["name"] or check_result["resources"][0]["uid"],
+            intern_value(check_result["resources"][0]["type"]),
+            intern_value(check_result["cloud"]["region"]),
+        )
 
     @staticmethod
-    def _update_check_status_and_stats(check: dict, status: str, score: int) -> dict:
-        check["stats"]["findings"]["total"] += 1
+    def _update_check_status_and_stats(check_state: CheckState, status: str, score: int) -> None:
+        check_state.findings_total += 1
 
         if status == "FAIL":
-            check["status"] = "FAIL"
-            check["stats"]["score"]["fail"] += score
-            check["stats"]["findings"]["fail"] += 1
+            check_state.status = "FAIL"
+            check_state.score_fail += score
+            check_state.findings_fail += 1
         elif status == "INFO" or status == "MANUAL":
-            if check["status"] != "FAIL":
-                check["status"] = "INFO"
-            check["stats"]["findings"]["info"] += 1
+            if check_state.status != "FAIL":
+                check_state.status = "INFO"
+            check_state.findings_info += 1
         else:
-            check["stats"]["score"]["pass"] += score
-            check["stats"]["findings"]["pass"] += 1
-
-        return check
+            check_state.score_pass += score
+            check_state.findings_pass += 1
 
     @staticmethod
-    def _update_compliance_status_and_stats(
-        compliance_result_data: dict, status: str, score: int
-    ) -> dict:
-        compliance_result_data["stats"]["findings"]["total"] += 1
+    def _update_compliance_status_and_stats(compliance_state: ComplianceState, status: str, score: int) -> None:
+        compliance_state.findings_total += 1
 
         if status == "FAIL":
-            compliance_result_data["status"] = "FAIL"
-            compliance_result_data["stats"]["score"]["fail"] += score
-            compliance_result_data["stats"]["findings"]["fail"] += 1
+            compliance_state.status = "FAIL"
+            compliance_state.score_fail += score
+            compliance_state.findings_fail += 1
         elif status == "INFO" or status == "MANUAL":
-            if compliance_result_data["status"] != "FAIL":
-                compliance_result_data["status"] = "INFO"
+            if compliance_state.status != "FAIL":
+                compliance_state.status = "INFO"
 
-            compliance_result_data["stats"]["findings"]["info"] += 1
+            compliance_state.findings_info += 1
         else:
-            compliance_result_data["stats"]["score"]["pass"] += score
-            compliance_result_data["stats"]["findings"]["pass"] += 1
-
-        # if not check_exists:
-        #     compliance_result_data['stats']['checks']['total'] += 1
-        #     if status == 'FAIL':
-        #         compliance_result_data['stats']['checks']['fail'] += 1
-        #     elif status == 'PASS':
-        #         compliance_result_data['stats']['checks']['pass'] += 1
-        #     else:
-        #         compliance_result_data['stats']['checks']['info'] += 1
+            compliance_state.score_pass += score
+            compliance_state.findings_pass += 1
+
+    def _make_compliance_state(
+            self, compliance_key: ComplianceKey, severity: str, check_result: dict
+    ) -> ComplianceState:
+        cloud_service_type, account, requirement_id, requirement_seq = compliance_key
+        _, automation = self.requirement_info[cloud_service_type]['Requirement_Details'].get(
+            requirement_seq, (None, None)
+        )
 
-        return compliance_result_data
+        return ComplianceState(
+            compliance_key,
+            description=intern_value(check_result["finding_info"]["desc"]),
+            status="UNSUPPORTED" if not automation else "PASS",
+            severity=severity,
+            service=intern_value(check_result["resources"][0]["group"]["name"]),
+            region_code=intern_value(check_result["cloud"]["region"]),
+        )
 
     def _make_base_compliance_result(
-            self, compliance_id: str, requirement_id: str, requirement_seq: int, check_id: str, severity: str,
-            check_result: dict
+            self, account: str, requirement_id: str, requirement_seq: int, cloud_service_type: str = None,
+            compliance_state: ComplianceState = None
     ) -> dict:
-        requirement_name, automation = next(
-            ((requirement['Description'], requirement['Automation'])
-             for requirement in self.requirement_info[self.cloud_service_type]['Requirements']
-             if requirement['Requirement_Seq'] == requirement_seq
-             ),
-            (None, None)
+        """Make a compliance record in the cloud service schema.
+
+        Without compliance_state, the record of a requirement that has no finding is made.
+        """
+        cloud_service_type = cloud_service_type or self.cloud_service_type
+        requirement_name, automation = self.requirement_info[cloud_service_type]['Requirement_Details'].get(
+            requirement_seq, (None, None)
         )
-        account = compliance_id.split(":")[2]
+        compliance_id = (
+            f"prowler:{self.provider}:{account}:{cloud_service_type}:{requirement_id}:{str(requirement_seq)}"
+        ).lower()
+        account = account.lower()
 
         compliance_result = {
             "name": requirement_name,
@@ -355,10 +532,12 @@ class ProwlerManager(ResourceManager):
                 "requirement_id": requirement_id,
                 "requirement_seq": requirement_seq,
                 "automation": automation,
-                "description": check_result["finding_info"]["desc"] if check_id else requirement_name,
-                "status": "UNSUPPORTED" if not automation else ("PASS" if check_id else "UNKNOWN"),
-                "severity": severity if check_id else "",
-                "service": check_result["resources"][0]["group"]["name"] if check_id else "",
+                "description": compliance_state.description if compliance_state else requirement_name,
+                "status": compliance_state.status if compliance_state else (
+                    "UNSUPPORTED" if not automation else "UNKNOWN"
+                ),
+                "severity": compliance_state.severity if compliance_state else "",
+                "service": compliance_state.service if compliance_state else "",
                 "checks": {},
                 "findings": [],
                 "display": {
@@ -391,7 +570,7 @@ class ProwlerManager(ResourceManager):
                             "options": {
                                 "provider": self.provider,
                                 "cloud_service_group": self.cloud_service_group,
-                                "cloud_service_type": self.cloud_service_type,
+                                "cloud_service_type": cloud_service_type,
                             },
                         }
                     }
@@ -400,44 +579,116 @@ class ProwlerManager(ResourceManager):
             "account": account,
             "provider": self.provider,
             "cloud_service_group": self.cloud_service_group,
-            "cloud_service_type": self.cloud_service_type,
-            "region_code": check_result["cloud"]["region"] if check_id else "global",
+            "cloud_service_type": cloud_service_type,
+            "region_code": compliance_state.region_code if compliance_state else "global",
         }
 
-        return compliance_result
+        if compliance_state:
+            compliance_data = compliance_result["data"]
+            compliance_data["checks"] = {
+                check_id: self._make_check(check_state) for check_id, check_state in compliance_state.checks.items()
+            }
+            compliance_data["findings"] = [dict(zip(FINDING_FIELDS, finding)) for finding in compliance_state.findings]
+            compliance_data["stats"]["score"]["pass"] = compliance_state.score_pass
+            compliance_data["stats"]["score"]["fail"] = compliance_state.score_fail
+            compliance_data["stats"]["findings"] = {
+                "total": compliance_state.findings_total,
+                "pass": compliance_state.findings_pass,
+                "fail": compliance_state.findings_fail,
+                "info": compliance_state.findings_info,
+            }
 
-    @staticmethod
-    def _wait_random_time():
-        random_time = round(random.uniform(0, 5), 2)
-        _LOGGER.debug(f"[_wait_random_time] sleep time: {random_time}")
+        return compliance_result
 
-        time.sleep(random_time)
+    def _get_compliance_checks(self) -> list:
+        compliance_checks = set()
+        for cloud_service_type in self.cloud_service_types:
+            for requirement in self.requirement_info[cloud_service_type]['Requirements']:
+                compliance_checks.update(requirement['Checks'])
+        return sorted(compliance_checks)
 
     def _check_compliance_framework(self):
         all_compliance_frameworks = list(COMPLIANCE_FRAMEWORKS[self.provider].keys())
-        if self.cloud_service_type not in all_compliance_frameworks:
-            raise ERROR_INVALID_PARAMETER(
-                key="options.compliance_framework",
-                reason=f"Not supported compliance framework. "
-                       f"(compliance_frameworks = {all_compliance_frameworks})",
-            )
+        for cloud_service_type in self.cloud_service_types:
+            if cloud_service_type not in all_compliance_frameworks:
+                raise ERROR_INVALID_PARAMETER(
+                    key="options.compliance_framework",
+                    reason=f"Not supported compliance framework. "
+                           f"(compliance_frameworks = {all_compliance_frameworks})",
+                )
 
     def _load_requirement_info(self):
+        self.requirement_info = {
+            cloud_service_type: self.get_requirement_info(self.provider, cloud_service_type)
+            for cloud_service_type in self.cloud_service_types
+        }
+
+    @classmethod
+    def get_requirement_info(cls, provider: str, compliance_framework: str) -> dict:
+        """Return the requirement info of a compliance framework from the process-wide LRU cache.
+
+        The returned dict is shared between collects and must be treated as read-only.
+        """
+        cache_key = (provider, compliance_framework)
+        with _REQUIREMENT_INFO_CACHE_LOCK:
+            if cache_key in _REQUIREMENT_INFO_CACHE:
+                _REQUIREMENT_INFO_CACHE.move_to_end(cache_key)
+                return _REQUIREMENT_INFO_CACHE[cache_key]
+
+        requirement_info = cls._make_requirement_info(provider, [compliance_framework])
+        cls._put_requirement_info(provider, requirement_info)
+        return requirement_info[compliance_framework]
+
+    @classmethod
+    def preload_requirement_info(cls, compliance_frameworks: dict) -> None:
+        """Warm the requirement info cache. ex) {"aws": ["CIS-3.0", "SOC2"]}"""
+        for provider, frameworks in compliance_frameworks.items():
+            _LOGGER.debug(f"[preload_requirement_info] provider: {provider}, frameworks: {frameworks}")
+            cls._put_requirement_info(provider, cls._make_requirement_info(provider, frameworks))
+
+    @staticmethod
+    def _put_requirement_info(provider: str, requirement_info: dict) -> None:
+        with _REQUIREMENT_INFO_CACHE_LOCK:
+            for compliance_framework, framework_info in requirement_info.items():
+                _REQUIREMENT_INFO_CACHE[(provider, compliance_framework)] = framework_info
+                _REQUIREMENT_INFO_CACHE.move_to_end((provider, compliance_framework))
+
+            while len(_REQUIREMENT_INFO_CACHE) > REQUIREMENT_INFO_CACHE_SIZE:
+                _REQUIREMENT_INFO_CACHE.popitem(last=False)
+
+    @staticmethod
+    def _make_requirement_info(provider: str, compliance_frameworks: list) -> dict:
         frameworks = {}
-        compliance_framework = COMPLIANCE_FRAMEWORKS[self.provider][self.cloud_service_type]
-        compliance_frameworks = Compliance.get_bulk(
-            self.provider if self.provider != "google_cloud" else "gcp"
+        all_compliance_frameworks = Compliance.get_bulk(
+            provider if provider != "google_cloud" else "gcp"
         )
-        sorted_requirements = natsorted(compliance_frameworks[compliance_framework].Requirements,
-                                        key=lambda x: (x.Id, x.Description))
-        frameworks[self.cloud_service_type] = compliance_frameworks[compliance_framework].dict()
-        frameworks[self.cloud_service_type]['Requirements'] = []
-
-        for i, requirement in enumerate(sorted_requirements):
-            requirement_json = requirement.dict()
-            requirement_checks = requirement_json.get('Checks', [])
-            requirement_json['Requirement_Seq'] = i + 1
-            requirement_json['Automation'] = bool(requirement_checks)
-            frameworks[self.cloud_service_type]['Requirements'].append(requirement_json)
-
-        self.requirement_info = frameworks
+
+        for cloud_service_type in compliance_frameworks:
+            compliance_framework = COMPLIANCE_FRAMEWORKS[provider][cloud_service_type]
+            sorted_requirements = natsorted(all_compliance_frameworks[compliance_framework].Requirements,
+                                            key=lambda x: (x.Id, x.Description))
+            frameworks[cloud_service_type] = all_compliance_frameworks[compliance_framework].dict()
+            frameworks[cloud_service_type]['Requirements'] = []
+
+            # Index requirements so that aggregation does not scan the requirement list per finding.
+            # (requirement_id, check_id) -> requirement_seq, requirement_seq -> (description, automation)
+            requirement_seqs = {}
+            requirement_details = {}
+
+            for i, requirement in enumerate(sorted_requirements):
+                requirement_json = requirement.dict()
+                requirement_checks = requirement_json.get('Checks', [])
+                requirement_json['Requirement_Seq'] = i + 1
+                requirement_json['Automation'] = bool(requirement_checks)
+                frameworks[cloud_service_type]['Requirements'].append(requirement_json)
+
+                for check_id in requirement_checks:
+                    requirement_seqs.setdefault((requirement_json['Id'], check_id), requirement_json['Requirement_Seq'])
+                requirement_details[requirement_json['Requirement_Seq']] = (
+                    requirement_json['Description'], requirement_json['Automation']
+                )
+
+            frameworks[cloud_service_type]['Requirement_Seqs'] = requirement_seqs
+            frameworks[cloud_service_type]['Requirement_Details'] = requirement_details
+
+        return frameworks
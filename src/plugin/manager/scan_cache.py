@@ -0,0 +1,189 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Generator, List
+
+from spaceone.core import utils
+
+from plugin.conf.collector_conf import SEVERITY_MAP
+from plugin.conf.global_conf import PLUGIN_DATA_DIR, SCAN_CACHE_DEFAULT_TTL, SCAN_CACHE_TTL_BY_SEVERITY
+
+__all__ = ["ScanCache"]
+
+_LOGGER = logging.getLogger("spaceone")
+_SCAN_CACHE_DIR = os.path.join(os.path.expanduser(PLUGIN_DATA_DIR), "scan_cache")
+_SCAN_CACHE_LOCK = threading.Lock()
+_INDEX_FILE_NAME = "index.json"
+
+# Secret keys that identify the scanned account without being secret themselves
+_SCOPE_SECRET_KEYS = [
+    "aws_access_key_id",
+    "role_arn",
+    "external_id",
+    "tenant_id",
+    "client_id",
+    "subscription_id",
+    "project_id",
+    "client_email",
+]
+
+
+class ScanCache:
+    """On-disk cache of the findings of previous scans, so that a collect reruns only the expired checks.
+
+    Findings are cached per check of a scope: the scanned account (non-secret identifiers of secret_data)
+    and the region filter. A check expires after the TTL of its check id or severity.
+
+    Files of a scope:
+        segment-*.jsonl: findings of a scan, one JSON object per line
+        index.json: check_id -> {"segment", "scanned_at", "severity"} of the latest successful scan
+    """
+
+    def __init__(
+            self, provider: str, secret_data: dict, regions: List[str] = None, check_ttl: dict = None,
+            cache_dir: str = _SCAN_CACHE_DIR
+    ):
+        self.provider = provider
+        self.check_ttl = check_ttl or {}
+        self.scope_dir = os.path.join(cache_dir, provider, self.make_scope_key(secret_data, regions))
+        self.index = self._load_index()
+        self._segment_file = None
+        self._segment_name = None
+        self._segment_severities = {}
+        self._scan_start_time = None
+
+    @staticmethod
+    def make_scope_key(secret_data: dict, regions: List[str] = None) -> str:
+        scope = {key: secret_data[key] for key in _SCOPE_SECRET_KEYS if secret_data.get(key)}
+        scope["regions"] = sorted(regions or [])
+        return hashlib.sha256(json.dumps(scope, sort_keys=True).encode("utf-8")).hexdigest()[:32]
+
+    def get_ttl(self, check_id: str, severity: str = None) -> float:
+        """options.scan_cache_ttl overrides the TTL by check id or severity. ex) {"iam_root_mfa_enabled": 600, "LOW": 86400}"""
+        if check_id in self.check_ttl:
+            return self.check_ttl[check_id]
+        if severity in self.check_ttl:
+            return self.check_ttl[severity]
+        return SCAN_CACHE_TTL_BY_SEVERITY.get(severity, SCAN_CACHE_DEFAULT_TTL)
+
+    def get_expired_checks(self, checks: List[str]) -> List[str]:
+        """Checks without cached findings: never scanned, past their TTL or whose segment file is missing"""
+        now = time.time()
+        segments = set(os.listdir(self.scope_dir)) if os.path.isdir(self.scope_dir) else set()
+        expired_checks = []
+        for check_id in checks:
+            entry = self.index.get(check_id)
+            if (
+                entry is None
+                or entry["segment"] not in segments
+                or now - entry["scanned_at"] >= self.get_ttl(check_id, entry["severity"])
+            ):
+                expired_checks.append(check_id)
+
+        _LOGGER.debug(f"[ScanCache] checks: {len(checks)}, expired: {len(expired_checks)}")
+        return expired_checks
+
+    def read_findings(self, checks: List[str]) -> Generator[dict, None, None]:
+        """Read the cached findings of the given checks (that are not expired)."""
+        missing_checks = []
+        for segment_name, segment_checks in self._group_by_segment(checks).items():
+            try:
+                yield from self._read_segment(segment_name, segment_checks)
+            except FileNotFoundError:
+                missing_checks.extend(segment_checks)
+
+        if not missing_checks:
+            return
+
+        # A concurrent collect of the same scope committed newer findings of the checks and removed the segment
+        with _SCAN_CACHE_LOCK:
+            self.index = self._load_index()
+        for segment_name, segment_checks in self._group_by_segment(missing_checks).items():
+            try:
+                yield from self._read_segment(segment_name, segment_checks)
+            except FileNotFoundError:
+                _LOGGER.warning(f"[ScanCache] segment not found: {segment_name}")
+
+    def start_scan(self) -> None:
+        os.makedirs(self.scope_dir, exist_ok=True)
+        self._scan_start_time = time.time()
+        self._segment_name = f"segment-{int(self._scan_start_time)}-{utils.random_string()}.jsonl"
+        self._segment_file = open(os.path.join(self.scope_dir, self._segment_name + ".tmp"), "w")
+        self._segment_severities = {}
+
+    def write_finding(self, finding: dict) -> None:
+        self._segment_file.write(json.dumps(finding, separators=(",", ":")))
+        self._segment_file.write("\n")
+        self._segment_severities.setdefault(
+            finding["metadata"]["event_code"], SEVERITY_MAP.get(finding["severity"], "UNKNOWN")
+        )
+
+    def commit_scan(self, checks: List[str]) -> None:
+        """Replace the cache entries of the scanned checks, including checks without any finding."""
+        segment_path = os.path.join(self.scope_dir, self._segment_name)
+        self._segment_file.close()
+        self._segment_file = None
+
+        # The segment is published with the index, so a concurrent commit does not remove it as unused
+        with _SCAN_CACHE_LOCK:
+            os.replace(segment_path + ".tmp", segment_path)
+            self.index = self._load_index()
+            for check_id in checks:
+                self.index[check_id] = {
+                    "segment": self._segment_name,
+                    "scanned_at": self._scan_start_time,
+                    "severity": self._segment_severities.get(check_id),
+                }
+            self._save_index()
+            self._remove_unused_segments()
+
+    def discard_scan(self) -> None:
+        """Remove the findings of a scan that was not committed."""
+        if self._segment_file is not None:
+            self._segment_file.close()
+            self._segment_file = None
+            os.remove(os.path.join(self.scope_dir, self._segment_name + ".tmp"))
+
+    def _group_by_segment(self, checks: List[str]) -> dict:
+        checks_by_segment = {}
+        for check_id in checks:
+            if check_id in self.index:
+                checks_by_segment.setdefault(self.index[check_id]["segment"], set()).add(check_id)
+        return checks_by_segment
+
+    def _read_segment(self, segment_name: str, segment_checks: set) -> Generator[dict, None, None]:
+        with open(os.path.join(self.scope_dir, segment_name)) as segment_file:
+            for line in segment_file:
+                finding = json.loads(line)
+                if finding["metadata"]["event_code"] in segment_checks:
+                    yield finding
+
+    def _load_index(self) -> dict:
+        index_path = os.path.join(self.scope_dir, _INDEX_FILE_NAME)
+        if not os.path.exists(index_path):
+            return {}
+
+        try:
+            with open(index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            _LOGGER.warning(f"[ScanCache] failed to load scan cache index: {e}")
+            return {}
+
+    def _save_index(self) -> None:
+        try:
+            with tempfile.NamedTemporaryFile("w", dir=self.scope_dir, delete=False) as f:
+                json.dump(self.index, f)
+            os.replace(f.name, os.path.join(self.scope_dir, _INDEX_FILE_NAME))
+        except OSError as e:
+            _LOGGER.warning(f"[ScanCache] failed to save scan cache index: {e}")
+
+    def _remove_unused_segments(self) -> None:
+        used_segments = {entry["segment"] for entry in self.index.values()}
+        for file_name in os.listdir(self.scope_dir):
+            if file_name.startswith("segment-") and file_name.endswith(".jsonl") and file_name not in used_segments:
+                os.remove(os.path.join(self.scope_dir, file_name))
@@ -0,0 +1,60 @@
+import logging
+from typing import List
+
+__all__ = ["ScopeEnumerator"]
+
+_LOGGER = logging.getLogger("spaceone")
+_GOOGLE_CLOUD_SCOPES = ["https://www.googleapis.com/auth/cloud-platform"]
+
+
+class ScopeEnumerator:
+    """Lists the scopes that the credentials of a scan can see: Azure subscriptions or GCP projects.
+
+    Scopes are listed the way prowler lists them when it scans every scope, so a scan split into
+    scope groups (options.shard_by_scope) covers the same subscriptions or projects.
+    """
+
+    def __init__(self, provider: str, secret_data: dict):
+        self.provider = provider
+        self._secret_data = secret_data
+
+    def list_scopes(self) -> List[str]:
+        if self.provider == "azure":
+            scopes = self._list_azure_subscriptions()
+        elif self.provider == "google_cloud":
+            scopes = self._list_gcp_projects()
+        else:
+            scopes = []
+
+        _LOGGER.debug(f"[ScopeEnumerator] {self.provider} scopes: {len(scopes)}")
+        return scopes
+
+    def _list_azure_subscriptions(self) -> List[str]:
+        from azure.identity import ClientSecretCredential
+        from azure.mgmt.subscription import SubscriptionClient
+
+        credential = ClientSecretCredential(
+            tenant_id=self._secret_data["tenant_id"],
+            client_id=self._secret_data["client_id"],
+            client_secret=self._secret_data["client_secret"],
+        )
+        subscription_client = SubscriptionClient(credential)
+        return [subscription.subscription_id for subscription in subscription_client.subscriptions.list()]
+
+    def _list_gcp_projects(self) -> List[str]:
+        from google.oauth2 import service_account
+        from googleapiclient import discovery
+
+        credentials = service_account.Credentials.from_service_account_info(
+            self._secret_data, scopes=_GOOGLE_CLOUD_SCOPES
+        )
+        service = discovery.build("cloudresourcemanager", "v1", credentials=credentials, cache_discovery=False)
+
+        project_ids = []
+        request = service.projects().list()
+        while request is not None:
+            response = request.execute()
+            project_ids.extend(project["projectId"] for project in response.get("projects", []))
+            request = service.projects().list_next(previous_request=request, previous_response=response)
+
+        return project_ids
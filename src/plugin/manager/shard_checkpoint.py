@@ -0,0 +1,137 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Generator, List
+
+from spaceone.core import utils
+
+from plugin.conf.global_conf import PLUGIN_DATA_DIR, SHARD_CHECKPOINT_TTL
+
+__all__ = ["ShardCheckpoint"]
+
+_LOGGER = logging.getLogger("spaceone")
+_CHECKPOINT_DIR = os.path.join(os.path.expanduser(PLUGIN_DATA_DIR), "checkpoints")
+_CHECKPOINT_LOCK = threading.Lock()
+_MANIFEST_FILE_NAME = "manifest.json"
+_SHARD_KEYS = ["name", "regions", "checks", "scope_filter"]
+
+
+class ShardCheckpoint:
+    """On-disk checkpoint of the shards of a scan (options.checkpoint_shards), so that a retried collect
+    reruns only the shards that failed or did not finish.
+
+    A checkpoint belongs to a scan: the scanned account, regions, checks, compliance frameworks and
+    sharding. It is removed when every shard succeeded and expires SHARD_CHECKPOINT_TTL seconds after
+    the scan that created it.
+
+    Files of a checkpoint:
+        manifest.json: {"created_at", "shards": [shard], "completed": {shard name: shard file}}
+        shard-*.jsonl: findings of a completed shard, one JSON object per line
+    """
+
+    def __init__(self, provider: str, scan_key: str, checkpoint_dir: str = _CHECKPOINT_DIR):
+        self.checkpoint_dir = os.path.join(checkpoint_dir, provider, scan_key)
+        self.manifest = self._load_manifest()
+
+    @staticmethod
+    def make_scan_key(*args) -> str:
+        return hashlib.sha256(json.dumps(args, sort_keys=True).encode("utf-8")).hexdigest()[:32]
+
+    def get_shards(self, shards: List[dict]) -> List[dict]:
+        """Shards of the checkpointed scan, or the given shards when a new scan starts.
+
+        Shards can be scheduled differently between collects (check runtime history), so a retried
+        collect keeps the shards of the checkpoint.
+        """
+        if self.manifest:
+            _LOGGER.debug(
+                f"[ShardCheckpoint] resume scan: {len(self.manifest['completed'])} of "
+                f"{len(self.manifest['shards'])} shards completed"
+            )
+            return [{key: shard[key] for key in _SHARD_KEYS if key in shard} for shard in self.manifest["shards"]]
+
+        with _CHECKPOINT_LOCK:
+            os.makedirs(self.checkpoint_dir, exist_ok=True)
+            self.manifest = {
+                "created_at": time.time(),
+                "shards": [{key: shard[key] for key in _SHARD_KEYS if key in shard} for shard in shards],
+                "completed": {},
+            }
+            self._save_manifest()
+
+        return shards
+
+    def is_completed(self, shard: dict) -> bool:
+        return shard["name"] in self.manifest["completed"]
+
+    def read_findings(self, shard: dict) -> Generator[dict, None, None]:
+        with open(os.path.join(self.checkpoint_dir, self.manifest["completed"][shard["name"]])) as f:
+            for line in f:
+                yield json.loads(line)
+
+    def write_findings(self, shard: dict, findings) -> Generator[dict, None, None]:
+        """Pass findings through while writing them to the shard file. Call complete() when the shard succeeded."""
+        shard_file_name = f"shard-{shard['name']}-{utils.random_string()}.jsonl"
+        shard["checkpoint_file"] = shard_file_name
+        with open(os.path.join(self.checkpoint_dir, shard_file_name + ".tmp"), "w") as f:
+            for finding in findings:
+                f.write(json.dumps(finding, separators=(",", ":")))
+                f.write("\n")
+                yield finding
+
+    def complete(self, shard: dict) -> None:
+        shard_file_name = shard.pop("checkpoint_file", None)
+        if shard_file_name is None:
+            # No output file: the shard has no findings
+            shard_file_name = f"shard-{shard['name']}-{utils.random_string()}.jsonl"
+            open(os.path.join(self.checkpoint_dir, shard_file_name), "w").close()
+        else:
+            shard_file_path = os.path.join(self.checkpoint_dir, shard_file_name)
+            os.replace(shard_file_path + ".tmp", shard_file_path)
+
+        with _CHECKPOINT_LOCK:
+            self.manifest["completed"][shard["name"]] = shard_file_name
+            self._save_manifest()
+
+    def discard(self, shard: dict) -> None:
+        """Remove the findings of a shard that failed."""
+        shard_file_name = shard.pop("checkpoint_file", None)
+        if shard_file_name:
+            try:
+                os.remove(os.path.join(self.checkpoint_dir, shard_file_name + ".tmp"))
+            except FileNotFoundError:
+                pass
+
+    def remove(self) -> None:
+        """Remove the checkpoint after every shard of the scan succeeded."""
+        _LOGGER.debug(f"[ShardCheckpoint] remove checkpoint: {self.checkpoint_dir}")
+        shutil.rmtree(self.checkpoint_dir, ignore_errors=True)
+        self.manifest = {}
+
+    def _load_manifest(self) -> dict:
+        manifest_path = os.path.join(self.checkpoint_dir, _MANIFEST_FILE_NAME)
+        if not os.path.exists(manifest_path):
+            return {}
+
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            _LOGGER.warning(f"[ShardCheckpoint] failed to load checkpoint manifest: {e}")
+            manifest = {}
+
+        if not manifest or time.time() - manifest["created_at"] >= SHARD_CHECKPOINT_TTL:
+            shutil.rmtree(self.checkpoint_dir, ignore_errors=True)
+            return {}
+
+        return manifest
+
+    def _save_manifest(self) -> None:
+        with tempfile.NamedTemporaryFile("w", dir=self.checkpoint_dir, delete=False) as f:
+            json.dump(self.manifest, f)
+        os.replace(f.name, os.path.join(self.checkpoint_dir, _MANIFEST_FILE_NAME))
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Tests import the plugin from the source tree: python -m pytest tests
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+# Synthetic findings of the benchmarks are reused by the tests
+BENCHMARK_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmark")
+sys.path.insert(0, BENCHMARK_DIR)
@@ -0,0 +1,58 @@
+"""Batch collects hold account scans back while the consumer is slow and stop them when the collect is canceled."""
+import threading
+import time
+
+from plugin.conf.global_conf import BATCH_RESPONSE_QUEUE_SIZE
+from plugin.manager.base import ResourceManager
+
+ACCOUNTS = [{"account_id": str(i)} for i in range(3)]
+
+
+class FakeConnector:
+    def __init__(self):
+        self.stopped = threading.Event()
+
+    def stop(self):
+        self.stopped.set()
+
+
+class FakeResourceManager(ResourceManager):
+    """Each account yields records without end until its scan is stopped"""
+    produced = 0
+    connectors = []
+    lock = threading.Lock()
+
+    def collect_cloud_services(self, options: dict, secret_data: dict, schema: str):
+        self.prowler_connector = FakeConnector()
+        with self.lock:
+            self.connectors.append(self.prowler_connector)
+
+        i = 0
+        while not self.prowler_connector.stopped.is_set():
+            with self.lock:
+                FakeResourceManager.produced += 1
+            yield {
+                "name": f"record-{i}",
+                "reference": {"resource_id": f"{secret_data['account_id']}-{i}"},
+                "account": secret_data["account_id"],
+                "data": {},
+            }
+            i += 1
+
+
+def test_canceled_batch_collect_stops_account_scans():
+    FakeResourceManager.produced = 0
+    FakeResourceManager.connectors = []
+    manager = FakeResourceManager()
+    responses = manager.collect_batch_cloud_services({}, ACCOUNTS, None)
+
+    next(responses)
+    time.sleep(0.5)
+    # The producers wait for the consumer instead of filling memory
+    assert FakeResourceManager.produced <= BATCH_RESPONSE_QUEUE_SIZE + 2 * len(ACCOUNTS)
+
+    start_time = time.monotonic()
+    responses.close()
+    assert time.monotonic() - start_time < 5
+    assert len(FakeResourceManager.connectors) == len(ACCOUNTS)
+    assert all(connector.stopped.is_set() for connector in FakeResourceManager.connectors)
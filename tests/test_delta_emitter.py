@@ -0,0 +1,52 @@
+"""Delta emission state of collectors that share a secret."""
+import pytest
+
+from plugin.manager.delta_emitter import DeltaEmitter
+from plugin.manager.prowler_manager import ProwlerManager
+
+SECRET_DATA = {"aws_access_key_id": "AKIAEXAMPLE", "aws_secret_access_key": "secret"}
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.setattr(DeltaEmitter.__init__, "__defaults__", ("keep_alive", str(tmp_path)))
+    manager = ProwlerManager()
+    manager.domain_id = "domain-1"
+    manager.provider = "aws"
+    return manager
+
+
+def collect(manager, options: dict, record_count: int = 3) -> list:
+    delta_emitter = manager._get_delta_emitter(options, SECRET_DATA)
+    framework = options["compliance_framework"]
+    emitted = []
+    for i in range(record_count):
+        cloud_service = {"reference": {"resource_id": f"{framework}-{i}"}, "data": {"status": "PASS"}}
+        emitted.append(delta_emitter.filter(cloud_service))
+    delta_emitter.save()
+    return emitted
+
+
+def test_collectors_of_different_frameworks_keep_their_own_state(manager):
+    options = [
+        {"provider": "aws", "compliance_framework": framework, "delta_emission": "suppress"}
+        for framework in ["CIS-3.0", "NIST-800-53-Revision-5"]
+    ]
+    for collector_options in options:
+        assert all(collect(manager, collector_options))
+
+    # The second collector did not wipe the hashes of the first one
+    for collector_options in options:
+        assert collect(manager, collector_options) == [None, None, None]
+
+
+def test_collectors_of_different_regions_keep_their_own_state(manager):
+    options = [
+        {"provider": "aws", "compliance_framework": "CIS-3.0", "regions": regions, "delta_emission": "suppress"}
+        for regions in [["us-east-1"], ["eu-west-1", "eu-west-2"]]
+    ]
+    for collector_options in options:
+        assert all(collect(manager, collector_options))
+
+    for collector_options in options:
+        assert collect(manager, collector_options) == [None, None, None]
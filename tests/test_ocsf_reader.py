@@ -0,0 +1,52 @@
+"""read_findings of complete, cut off and empty prowler outputs, with the json C scanner and with ijson."""
+import io
+import json
+
+import pytest
+
+from aggregation_benchmark import make_manager, make_findings
+from plugin.connector import ocsf_reader
+from plugin.connector.ocsf_reader import read_findings
+from plugin.error.custom import ERROR_INVALID_PROWLER_OUTPUT
+
+
+@pytest.fixture(params=["json", "ijson"])
+def parser(request, monkeypatch):
+    backend = ocsf_reader._get_ijson_backend() if request.param == "ijson" else None
+    monkeypatch.setattr(ocsf_reader, "_IJSON_BACKEND", backend)
+    return request.param
+
+
+@pytest.fixture(scope="module")
+def findings():
+    return make_findings(make_manager("aws", "CIS-3.0"), 20)
+
+
+def cut_off(findings: list, count: int) -> bytes:
+    """Output of a prowler that was terminated while it wrote finding number count"""
+    data = json.dumps(findings).encode("utf-8")
+    element_start = len(json.dumps(findings[:count])) - 1
+    return data[:element_start + 20]
+
+
+def test_complete_output_is_read(parser, findings):
+    output = io.BytesIO(json.dumps(findings).encode("utf-8"))
+    assert list(read_findings(output)) == findings
+
+
+@pytest.mark.parametrize("data", [b"", b"[]"])
+def test_empty_output_has_no_findings(parser, data):
+    assert list(read_findings(io.BytesIO(data))) == []
+
+
+def test_cut_off_output_of_terminated_prowler_is_read_up_to_the_cut(parser, findings):
+    read = list(read_findings(io.BytesIO(cut_off(findings, 12)), is_complete=False))
+    assert read == findings[:12]
+
+
+def test_cut_off_output_of_prowler_that_exited_0_raises(parser, findings):
+    read = []
+    with pytest.raises(ERROR_INVALID_PROWLER_OUTPUT):
+        for finding in read_findings(io.BytesIO(cut_off(findings, 12))):
+            read.append(finding)
+    assert read == findings[:12]
@@ -0,0 +1,70 @@
+"""Compliance records aggregated from output files in worker processes and merged equal the sequential records."""
+import json
+import os
+from collections import OrderedDict
+
+import pytest
+
+from aggregation_benchmark import make_manager, make_findings
+from partial_aggregation_benchmark import split_findings, convert
+from plugin.connector.ocsf_reader import read_findings
+from plugin.manager import partial_aggregator, prowler_manager
+from plugin.manager.partial_aggregator import PartialAggregator
+
+PROVIDER = "aws"
+
+
+def write_output_files(directory, findings: list, file_count: int, seed: int) -> list:
+    file_paths = []
+    for i, part in enumerate(split_findings(findings, file_count, seed)):
+        file_paths.append(os.path.join(directory, f"output-{i}.ocsf.json"))
+        with open(file_paths[-1], "w") as f:
+            json.dump(part, f)
+    return file_paths
+
+
+def aggregate_sequentially(compliance_framework: str, file_paths: list) -> list:
+    manager = make_manager(PROVIDER, compliance_framework)
+    for file_path in file_paths:
+        with open(file_path, "rb") as f:
+            for finding in read_findings(f):
+                manager.make_compliance_results(finding)
+    return convert(manager)
+
+
+@pytest.mark.parametrize("compliance_framework", ["CIS-3.0", "NIST-800-53-Revision-5"])
+@pytest.mark.parametrize("seed", [0, 1])
+def test_partial_results_equal_sequential_results(tmp_path, compliance_framework, seed):
+    manager = make_manager(PROVIDER, compliance_framework)
+    file_paths = write_output_files(tmp_path, make_findings(manager, 3000, seed), 4, seed)
+
+    aggregator = PartialAggregator(PROVIDER, [compliance_framework], manager.requirement_info, 2)
+    try:
+        for file_path in file_paths:
+            aggregator.submit(file_path)
+        for compliance_results, _, _ in aggregator.get_results():
+            manager.merge_compliance_results(compliance_results)
+    finally:
+        aggregator.shutdown()
+
+    assert convert(manager) == aggregate_sequentially(compliance_framework, file_paths)
+
+
+def test_worker_does_not_load_compliance_frameworks(tmp_path, monkeypatch):
+    manager = make_manager(PROVIDER, "CIS-3.0")
+    file_paths = write_output_files(tmp_path, make_findings(manager, 500), 1, 0)
+    expected = aggregate_sequentially("CIS-3.0", file_paths)
+
+    def get_bulk(provider):
+        raise AssertionError("requirement info is loaded by the worker")
+
+    # A worker process starts with an empty requirement info cache
+    monkeypatch.setattr(prowler_manager, "_REQUIREMENT_INFO_CACHE", OrderedDict())
+    monkeypatch.setattr(prowler_manager.Compliance, "get_bulk", get_bulk)
+    monkeypatch.setattr(partial_aggregator, "_WORKER_MANAGER", None)
+    partial_aggregator._init_worker(PROVIDER, ["CIS-3.0"], manager.requirement_info)
+    compliance_results, count, _ = partial_aggregator._aggregate_file(file_paths[0])
+
+    manager.merge_compliance_results(compliance_results)
+    assert count == 500
+    assert convert(manager) == expected
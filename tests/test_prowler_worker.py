@@ -0,0 +1,15 @@
+"""Prowler internals hooked by workers that stream their findings."""
+from plugin.connector import prowler_worker
+
+
+def test_installed_prowler_has_the_findings_hooks():
+    assert prowler_worker._get_missing_hooks() == []
+
+
+def test_moved_hooks_are_reported(monkeypatch):
+    hooks = prowler_worker._FINDINGS_HOOKS + [
+        "prowler.__main__.FindingOutput",
+        "prowler.lib.outputs.moved_finding.Finding.generate_output",
+    ]
+    monkeypatch.setattr(prowler_worker, "_FINDINGS_HOOKS", hooks)
+    assert prowler_worker._get_missing_hooks() == hooks[-2:]
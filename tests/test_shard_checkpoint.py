@@ -0,0 +1,45 @@
+"""Check runtime history of a scan that resumes from a shard checkpoint."""
+from types import SimpleNamespace
+
+import pytest
+
+from plugin.connector.prowler_connector import ProwlerConnector
+from plugin.manager.check_scheduler import CheckScheduler
+from plugin.manager.shard_checkpoint import ShardCheckpoint
+
+CHECKS = ["ec2_ebs_default_encryption", "iam_root_mfa_enabled", "s3_bucket_default_encryption"]
+OPTIONS = {"provider": "aws", "compliance_framework": "CIS-3.0", "check_list": CHECKS, "shard_by_check": True}
+
+
+@pytest.fixture
+def history_path(tmp_path, monkeypatch):
+    history_path = str(tmp_path / "check_runtimes.json")
+    monkeypatch.setattr(CheckScheduler.__init__, "__defaults__", (history_path,))
+    return history_path
+
+
+def run_shard(self, shard: dict, cmd: list, output_dir: str, env: dict = None):
+    """A prowler process that succeeds without findings after 30 seconds"""
+    shard["returncode"] = 0
+    shard["duration"] = 30.0
+    return SimpleNamespace(
+        admission=SimpleNamespace(wait_time=0.0), duration=30.0, returncode=0, timed_out=False,
+        err_message=None, has_no_findings=True, last_message="", output_json_file=None,
+    )
+
+
+def test_resumed_scan_records_check_runtimes(tmp_path, history_path, monkeypatch):
+    monkeypatch.setattr(ProwlerConnector, "_run_shard", run_shard)
+
+    # A previous collect created the checkpoint with its own shards and failed before any of them completed
+    ShardCheckpoint("aws", "scan", str(tmp_path)).get_shards(
+        [{"name": "checks-0", "regions": [], "checks": CHECKS}]
+    )
+    checkpoint = ShardCheckpoint("aws", "scan", str(tmp_path))
+    assert checkpoint.manifest
+
+    connector = ProwlerConnector()
+    list(connector._scan(["prowler"], str(tmp_path), OPTIONS, CHECKS, checkpoint=checkpoint))
+
+    check_runtimes = CheckScheduler("aws").check_runtimes
+    assert sorted(check_runtimes) == CHECKS